@@ -91,6 +91,8 @@ if __name__ == '__main__':
     try:
         # -- Launch RPC watchdog
         ex.mainWindow.rpc_watchdogThread.start()
+        # -- Launch DB maintenance watchdog
+        ex.mainWindow.db_watchdogThread.start()
     except Exception as e:
         print(e)
 
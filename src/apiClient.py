@@ -4,41 +4,239 @@
 # Distributed under the MIT software license, see the accompanying
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
-from blockbookClient import BlockBookClient
+from collections import OrderedDict
+from concurrent.futures import wait, FIRST_COMPLETED
+from copy import deepcopy
+import threading
+import time
+
+from blockbookClient import BlockBookClient, BLOCKBOOK_URLS, BLOCKBOOK_TESTNET_URLS
+from constants import API_HEDGE_DELAY, API_MIN_HEDGE_DELAY, API_BACKEND_COOLDOWN, API_MAX_COOLDOWN, \
+    API_CACHE_SIZE, API_CACHE_TTL
 from cryptoIDClient import CryptoIDClient
+from httpSession import LatencyStats
+from misc import getCallerName, getFunctionName, printError, printDbg
+from threads import ThreadFuns, QUEUE_API
+
+# bias (seconds) added for each position in the priority list, so that
+# the primary backend is preferred when the latencies are similar
+PRIORITY_BIAS = 0.05
+
+
+class ApiBackend:
+    """
+    Explorer client with its rolling health stats
+    """
+    def __init__(self, name, client, priority=0):
+        self.name = name
+        self.client = client
+        self.priority = priority
+        self.stats = LatencyStats()
+        self.failures = 0  # consecutive
+        self.downUntil = 0
+
+    def isDown(self):
+        return time.monotonic() < self.downUntil
+
+    def score(self):
+        # expected time of a successful answer (lower is better).
+        # backends without stats are only preferred to slow ones
+        rate = self.stats.successRate()
+        p50 = self.stats.percentile(0.5)
+        if p50 is None:
+            p50 = API_HEDGE_DELAY
+        return p50 / max(rate if rate is not None else 1, 0.05) + self.priority * PRIORITY_BIAS
+
+    def hedgeDelay(self):
+        p95 = self.stats.percentile(0.95)
+        return max(p95 if p95 is not None else API_HEDGE_DELAY, API_MIN_HEDGE_DELAY)
+
 
-from misc import getCallerName, getFunctionName, printException, printError
+class ApiRouter:
+    """
+    Sends each request to the healthiest backend. A request slower than the backend p95
+    is duplicated (hedged) to the next one, and the first valid answer is returned.
+    Failing backends are skipped for an increasing cooldown, then tried again.
+    The requests run in the QUEUE_API threads of the shared pool.
+    """
+    def __init__(self, backends, cooldown=API_BACKEND_COOLDOWN):
+        self.backends = backends
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.closed = False
 
+    def ranked(self):
+        with self.lock:
+            up = sorted((b for b in self.backends if not b.isDown()), key=lambda b: b.score())
+            down = sorted((b for b in self.backends if b.isDown()), key=lambda b: b.downUntil)
+        return up + down
 
-def process_api_exceptions(func):
-    def process_api_exceptions_int(*args, **kwargs):
-        client = args[0]
+    def run(self, backend, method, args):
+        start = time.monotonic()
         try:
-            return func(*args, **kwargs)
+            res = getattr(backend.client, method)(*args)
+            error = None if res is not None else "no data"
         except Exception as e:
-            message = "Primary API source not responding. Trying secondary"
-            printException(getCallerName(True), getFunctionName(True), message, str(e))
-            try:
-                client.api = CryptoIDClient(client.isTestnet)
-                return func(*args, **kwargs)
+            res = None
+            error = f"{e.__class__.__name__}: {e}"
+
+        with self.lock:
+            backend.stats.record(time.monotonic() - start, error)
+            if error is None:
+                backend.failures = 0
+                backend.downUntil = 0
+            else:
+                backend.failures += 1
+                backend.downUntil = time.monotonic() + min(self.cooldown * 2 ** (backend.failures - 1), API_MAX_COOLDOWN)
+        if error is not None:
+            printDbg(f"API backend {backend.name} failed {method}: {error}")
+
+        return res
+
+    def call(self, method, *args):
+        remaining = self.ranked()
+        pending = {}
+
+        def launch():
+            backend = remaining.pop(0)
+            if self.closed:
+                remaining.clear()
+                return
+            pending[ThreadFuns.callInThread(self.run, (backend, method, args), QUEUE_API)] = backend
+
+        launch()
+        while len(pending) > 0:
+            # hedge to the next backend if the only pending request is slow
+            timeout = None
+            if len(remaining) > 0 and len(pending) == 1:
+                timeout = next(iter(pending.values())).hedgeDelay()
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if len(done) == 0:
+                printDbg(f"API: hedging {method} to {remaining[0].name}")
+                launch()
+                continue
+
+            for future in done:
+                pending.pop(future)
+                res = future.result()
+                if res is not None:
+                    return res
+
+            # failed: try the next backend
+            if len(pending) == 0 and len(remaining) > 0:
+                launch()
+
+        return None
 
-            except Exception as e:
-                printError(getCallerName(True), getFunctionName(True), str(e))
-                return None
+    def shutdown(self):
+        # requests already sent are completed, no new ones are sent
+        self.closed = True
 
-    return process_api_exceptions_int
+    def getStats(self):
+        """
+        returns a dict backend --> {count, errors, success_rate, p50, p95, last_error, down}
+        """
+        with self.lock:
+            return {b.name: dict(b.stats.toDict(), down=b.isDown()) for b in self.backends}
+
+
+class ApiCache:
+    """
+    Bounded LRU cache of the explorer answers, keyed by (network, method, address).
+    Entries expire after `ttl` seconds or when a new block is seen on their network.
+    """
+    def __init__(self, max_size=API_CACHE_SIZE, ttl=API_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key --> (value, time, block height)
+        self.heights = {}  # network --> last block height
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, t, height = entry
+                if time.monotonic() - t < self.ttl and height == self.heights.get(key[0]):
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    # callers can modify the answer
+                    return deepcopy(value)
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (deepcopy(value), time.monotonic(), self.heights.get(key[0]))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def setBlockHeight(self, network, height):
+        with self.lock:
+            if height != self.heights.get(network):
+                self.heights[network] = height
+                # answers from older blocks are stale
+                for key in [k for k in self.entries if k[0] == network]:
+                    del self.entries[key]
+
+    def invalidate(self, network):
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == network]:
+                del self.entries[key]
+
+    def getStats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
+
+
+# shared by the api clients
+api_cache = ApiCache()
 
 
 class ApiClient:
 
     def __init__(self, isTestnet=False):
         self.isTestnet = isTestnet
-        self.api = BlockBookClient(isTestnet)
+        urls = BLOCKBOOK_TESTNET_URLS if isTestnet else BLOCKBOOK_URLS
+        backends = [ApiBackend(url, BlockBookClient(isTestnet, url), i) for i, url in enumerate(urls)]
+        if not isTestnet:
+            # no CryptoID testnet server
+            backends.append(ApiBackend("CryptoID", CryptoIDClient(), len(backends)))
+        self.router = ApiRouter(backends)
+
+    def cachedCall(self, method, address):
+        key = ("testnet" if self.isTestnet else "mainnet", method, address)
+        res = api_cache.get(key)
+        if res is None:
+            res = self.router.call(method, address)
+            if res is None:
+                printError(getCallerName(True), getFunctionName(True), f"No API backend responding for {address}")
+            else:
+                api_cache.put(key, res)
+        return res
 
-    @process_api_exceptions
     def getAddressUtxos(self, address):
-        return self.api.getAddressUtxos(address)
+        return self.cachedCall('getAddressUtxos', address)
 
-    @process_api_exceptions
     def getBalance(self, address):
-        return self.api.getBalance(address)
+        return self.cachedCall('getBalance', address)
+
+    def setBlockHeight(self, height):
+        # drop the cached answers when a new block is seen
+        api_cache.setBlockHeight("testnet" if self.isTestnet else "mainnet", height)
+
+    def invalidateCache(self):
+        api_cache.invalidate("testnet" if self.isTestnet else "mainnet")
+
+    def getCacheStats(self):
+        return api_cache.getStats()
+
+    def getStats(self):
+        return self.router.getStats()
+
+    def close(self):
+        self.router.shutdown()
@@ -4,54 +4,32 @@
 # Distributed under the MIT software license, see the accompanying
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
-import requests
+from httpSession import api_session
 
-from misc import getCallerName, getFunctionName, printException
-
-
-def process_blockbook_exceptions(func):
-    def process_blockbook_exceptions_int(*args, **kwargs):
-        client = args[0]
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            if client.isTestnet:
-                new_url = "https://testnet.duddino.com/"
-            else:
-                new_url = "https://zkbitcoin.com/"
-            message = f"BlockBook Client exception on {client.url}\nTrying backup server {new_url}"
-            printException(getCallerName(True), getFunctionName(True), message, str(e))
-
-            try:
-                client.url = new_url
-                return func(*args, **kwargs)
-
-            except Exception:
-                raise
-
-    return process_blockbook_exceptions_int
+# Blockbook servers (primary first). Failover is handled by ApiClient.
+BLOCKBOOK_URLS = ["https://explorer.duddino.com", "https://zkbitcoin.com"]
+BLOCKBOOK_TESTNET_URLS = ["https://testnet.fuzzbawls.pw", "https://testnet.duddino.com"]
 
 
 class BlockBookClient:
 
-    def __init__(self, isTestnet=False):
+    def __init__(self, isTestnet=False, url=None):
         self.isTestnet = isTestnet
-        if isTestnet:
-            self.url = "https://testnet.fuzzbawls.pw"
-        else:
-            self.url = "https://explorer.duddino.com/"
+        if url is None:
+            url = BLOCKBOOK_TESTNET_URLS[0] if isTestnet else BLOCKBOOK_URLS[0]
+        self.url = url
 
     def checkResponse(self, method, param=""):
-        url = f"{self.url}/api/{method}"
+        endpoint = f"{self.url.rstrip('/')}/api/{method}"
+        url = endpoint
         if param != "":
-            url += "/{param}"
-        resp = requests.get(url, data={}, verify=True)
+            url += f"/{param}"
+        resp = api_session.get(url, endpoint=endpoint)
         if resp.status_code == 200:
             data = resp.json()
             return data
         raise Exception("Invalid response")
 
-    @process_blockbook_exceptions
     def getAddressUtxos(self, address):
         utxos = self.checkResponse("utxo", address)
         # Add script for cryptoID legacy
@@ -59,6 +37,6 @@ class BlockBookClient:
             u["script"] = ""
         return utxos
 
-    @process_blockbook_exceptions
     def getBalance(self, address):
-        return self.checkResponse("address", address)["balance"]
+        # satoshis
+        return int(self.checkResponse("address", address)["balance"])
@@ -27,10 +27,42 @@ home_dir = os.path.expanduser('~')
 user_dir = os.path.join(home_dir, APPDATA_DIRNAME)
 log_File = os.path.join(user_dir, 'debug.log')
 database_File = os.path.join(user_dir, 'application.db')
+DB_BUSY_TIMEOUT = 30  # seconds a connection waits on a locked database
+DB_CACHED_STATEMENTS = 256  # prepared statements kept by each connection
+DB_MAINTENANCE_INTERVAL = 60  # seconds between two database maintenance checks
+DB_MAINTENANCE_IDLE_TIME = 30  # seconds without queries before the database is considered idle
+DB_VACUUM_STEP_PAGES = 256  # max pages reclaimed by each incremental vacuum step
+DB_FREELIST_THRESHOLD = 2560  # free pages that trigger a vacuum step even if not idle
+RAWTXES_MAX_BYTES = 64 * 1024 * 1024  # disk budget of the raw txes cache
+RAWTXES_EVICTION_STEP = 500  # max raw txes removed by each eviction step
+RAWTXES_TOUCH_INTERVAL = 3600  # min seconds between two access time updates of a raw tx
+ADDRESS_CACHE_SIZE = 4096  # memoized address derivations / validations
+PIPELINE_QUEUE_SIZE = 500  # max items waiting between two stages of a pipeline
+JOBS_CHECKPOINT_TTL = 24 * 60 * 60  # seconds after which the checkpoint of an interrupted job is discarded
 NEW_SIGS_HEIGHT_MAINNET = 2153200
 NEW_SIGS_HEIGHT_TESTNET = 1347000
-SECONDS_IN_2_MONTHS = 60 * 24 * 60 * 60
 MAX_INPUTS_NO_WARNING = 75
+API_MAX_WORKERS = 8  # max concurrent requests to the explorer APIs
+API_MAX_REQ_PER_SEC = 10  # max requests per second sent to each explorer host
+API_REQUEST_TIMEOUT = (5, 10)  # (connect, read) seconds
+API_MAX_RETRIES = 2  # retries of failed explorer requests
+API_BACKOFF_BASE = 0.5  # seconds (doubled at each retry, with random jitter)
+API_STATS_WINDOW = 100  # number of requests in the latency stats of each endpoint
+API_HEDGE_DELAY = 2  # seconds before a request is duplicated to the next backend (when the p95 is unknown)
+API_MIN_HEDGE_DELAY = 0.2  # seconds
+API_BACKEND_COOLDOWN = 30  # seconds a failing backend is skipped (doubled at each consecutive failure)
+API_MAX_COOLDOWN = 600  # seconds
+API_CACHE_SIZE = 2000  # max cached explorer answers
+API_CACHE_TTL = 120  # seconds
+BALANCES_TIMEOUT = 20  # max seconds waiting for the masternodes balances in Check-All
+BALANCES_POLL_INTERVAL = 0.2  # seconds between two checks of the Check-All cancellation
+REWARDS_RETRY_DELAY = 60  # seconds before retrying a failed automatic update of the saved rewards
+REWARDS_MAX_RETRY_DELAY = 1800  # seconds (the delay is doubled at each failure)
+RPC_MAX_WORKERS = 4  # max concurrent connections to the RPC server
+RPC_BATCH_SIZE = 100  # max calls in a single JSON-RPC batch request
+THREAD_POOL_QUEUES = {'network': 4, 'hwdevice': 1, 'explorer': API_MAX_WORKERS,  # worker threads of each queue
+                      'api': 2 * API_MAX_WORKERS, 'rpc': RPC_MAX_WORKERS}
+TXCACHE_MAX_BYTES = 32 * 1024 * 1024  # memory tier of the raw txes cache
 
 
 def NewSigsActive(nHeight, fTestnet=False):
@@ -5,8 +5,8 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 from random import choice
-import requests
 
+from httpSession import api_session
 from misc import getCallerName, getFunctionName, printException
 
 api_keys = ["b62b40b5091e", "f1d66708a077", "ed85c85c0126", "ccc60d06f737"]
@@ -51,7 +51,7 @@ class CryptoIDClient:
     def checkResponse(self, parameters):
         key = choice(api_keys)
         parameters['key'] = key
-        resp = requests.get(self.url, params=parameters)
+        resp = api_session.get(self.url, endpoint=f"{self.url}?q={parameters.get('q')}", params=parameters)
         if resp.status_code == 200:
             data = resp.json()
             return data
@@ -73,4 +73,9 @@ class CryptoIDClient:
         self.parameters = {}
         self.parameters['q'] = 'getbalance'
         self.parameters['a'] = address
-        return self.checkResponse(self.parameters)
+        res = self.checkResponse(self.parameters)
+        if res is None:
+            return None
+        else:
+            # PIV --> satoshis (as the other backends)
+            return round(float(res) * 1e8)
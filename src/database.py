@@ -7,12 +7,88 @@
 import logging
 import sqlite3
 import threading
+import weakref
+import zlib
+from time import time
 
-from constants import database_File, trusted_RPC_Servers, DEFAULT_MN_CONF
+import simplejson as json
+
+from constants import database_File, trusted_RPC_Servers, DEFAULT_MN_CONF, \
+    DB_BUSY_TIMEOUT, DB_CACHED_STATEMENTS, DB_MAINTENANCE_IDLE_TIME, DB_VACUUM_STEP_PAGES, \
+    DB_FREELIST_THRESHOLD, RAWTXES_MAX_BYTES, RAWTXES_EVICTION_STEP, RAWTXES_TOUCH_INTERVAL, \
+    JOBS_CHECKPOINT_TTL
 from proposals import Proposal, vote_type, vote_index
 from misc import printDbg, getCallerName, getFunctionName, printException, add_defaultKeys_to_dict
 
 
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+# RAWTXES.rawtx format marker (first byte of the blob)
+RAWTX_PLAIN = 0
+RAWTX_ZLIB = 1
+
+
+def encodeRawTx(rawtx):
+    """
+    rawtx (bytes or hex string) --> blob: format marker + (compressed) bytes
+    """
+    if isinstance(rawtx, str):
+        rawtx = bytes.fromhex(rawtx)
+    compressed = zlib.compress(rawtx)
+    if len(compressed) < len(rawtx):
+        return bytes([RAWTX_ZLIB]) + compressed
+    return bytes([RAWTX_PLAIN]) + rawtx
+
+
+def decodeRawTx(blob):
+    """
+    blob --> rawtx bytes
+    """
+    if isinstance(blob, str):
+        # hex text (schema version < 2)
+        return bytes.fromhex(blob)
+    if blob[0] == RAWTX_ZLIB:
+        return zlib.decompress(blob[1:])
+    return bytes(blob[1:])
+
+
+def migrateRawTxesToBlob(conn):
+    rows = conn.execute("SELECT tx_hash, rawtx FROM RAWTXES WHERE typeof(rawtx) = 'text'").fetchall()
+    updated = []
+    invalid = []
+    for tx_hash, rawtx in rows:
+        try:
+            updated.append((encodeRawTx(rawtx), tx_hash))
+        except ValueError:
+            invalid.append((tx_hash,))
+    conn.executemany("UPDATE RAWTXES SET rawtx = ? WHERE tx_hash = ?", updated)
+    conn.executemany("DELETE FROM RAWTXES WHERE tx_hash = ?", invalid)
+
+
+# Schema upgrade chain (tracked with PRAGMA user_version).
+# Entry n lists the statements (SQL strings or callables taking the connection)
+# that bring the schema from version n to n+1. Only append new entries.
+SCHEMA_MIGRATIONS = [
+    # v1: indexes for rewards per masternode, rawtxes eviction order and votes per proposal
+    ["CREATE INDEX IF NOT EXISTS idx_rewards_mn_name ON REWARDS(mn_name)",
+     "CREATE INDEX IF NOT EXISTS idx_rawtxes_lastfetch ON RAWTXES(lastfetch)",
+     "CREATE INDEX IF NOT EXISTS idx_myvotes_p_hash ON MY_VOTES(p_hash)"],
+    # v2: raw transactions stored as (compressed) binary blobs instead of hex text
+    [migrateRawTxesToBlob],
+    # v3: checkpoints of the interrupted background jobs
+    ["CREATE TABLE IF NOT EXISTS JOBS("
+     " job_key TEXT PRIMARY KEY, checkpoint TEXT, updated INTEGER)"],
+]
+
+
+class DbConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection does not support weak references: subclass it so that
+    the Database can track the per-thread connections without keeping them alive.
+    """
+    pass
+
+
 class Database():
 
     '''
@@ -24,7 +100,14 @@ class Database():
         self.file_name = database_File
         self.lock = threading.Lock()
         self.isOpen = False
-        self.conn = None
+        # one long-lived connection per thread (WAL lets readers and the writer proceed concurrently)
+        self.local = threading.local()
+        self.connections = weakref.WeakSet()
+        self.generation = 0
+        self.lastActivity = time()
+        # bytes stored in RAWTXES (None: counted again by the next eviction step).
+        # replaced txes are counted twice: it can only overestimate, triggering an exact count
+        self.rawTxesSize = None
         printDbg("DB: Initialized")
 
     def openDB(self):
@@ -34,13 +117,18 @@ class Database():
 
         with self.lock:
             try:
-                if self.conn is None:
-                    self.conn = sqlite3.connect(self.file_name)
-
+                conn = self.connect()
+                # free pages are reclaimed in small steps by runMaintenance, not by full VACUUMs.
+                # Switching an existing database to incremental auto_vacuum needs one last VACUUM.
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != SQLITE_AUTO_VACUUM_INCREMENTAL:
+                    printDbg("DB: Enabling incremental auto-vacuum...")
+                    conn.execute(f"PRAGMA auto_vacuum = {SQLITE_AUTO_VACUUM_INCREMENTAL}")
+                    conn.execute("VACUUM")
+                conn.execute("PRAGMA journal_mode = WAL")
                 self.initTables()
-                self.conn.commit()
-                self.conn.close()
-                self.conn = None
+                conn.commit()
+                self.updateSchema()
+                self.rawTxesSize = None
                 self.isOpen = True
                 printDbg("DB: Database open")
 
@@ -57,10 +145,12 @@ class Database():
 
         with self.lock:
             try:
-                if self.conn is not None:
-                    self.conn.close()
+                for conn in list(self.connections):
+                    conn.close()
 
-                self.conn = None
+                self.connections.clear()
+                # invalidate the connections cached by the other threads
+                self.generation += 1
                 self.isOpen = False
                 printDbg("DB: Database closed")
 
@@ -68,54 +158,91 @@ class Database():
                 err_msg = 'SQLite closing error'
                 printException(getCallerName(), getFunctionName(), err_msg, e.args)
 
+    def connect(self):
+        """
+        Returns the connection of the calling thread, opening it the first time.
+        Connections are kept open (and their prepared statements cached) until close(),
+        or until the owning thread exits. Must be called with self.lock held.
+        """
+        if getattr(self.local, 'generation', None) == self.generation:
+            return self.local.conn
+
+        conn = sqlite3.connect(self.file_name, timeout=DB_BUSY_TIMEOUT,
+                               cached_statements=DB_CACHED_STATEMENTS, check_same_thread=False,
+                               factory=DbConnection)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        self.connections.add(conn)
+        self.local.conn = conn
+        self.local.generation = self.generation
+        return conn
+
     def getCursor(self):
         if self.isOpen:
-            self.lock.acquire()
             try:
-                if self.conn is None:
-                    self.conn = sqlite3.connect(self.file_name)
-                return self.conn.cursor()
+                with self.lock:
+                    conn = self.connect()
+                    self.lastActivity = time()
+                return conn.cursor()
 
             except Exception as e:
                 err_msg = 'SQLite error getting cursor'
                 printException(getCallerName(), getFunctionName(), err_msg, e.args)
-                self.lock.release()
 
         else:
             raise Exception("Database closed")
 
-    def releaseCursor(self, rollingBack=False, vacuum=False):
+    def releaseCursor(self, rollingBack=False):
         if self.isOpen:
             try:
-                if self.conn is not None:
-                    # commit
-                    if rollingBack:
-                        self.conn.rollback()
-
-                    else:
-                        self.conn.commit()
-                        if vacuum:
-                            self.conn.execute('vacuum')
+                conn = self.local.conn
+                # commit
+                if rollingBack:
+                    conn.rollback()
 
-                    # close connection
-                    self.conn.close()
-
-                self.conn = None
+                else:
+                    conn.commit()
 
             except Exception as e:
                 err_msg = 'SQLite error releasing cursor'
                 printException(getCallerName(), getFunctionName(), err_msg, e.args)
 
-            finally:
-                self.lock.release()
-
         else:
             raise Exception("Database closed")
 
+    def runMaintenance(self, idle_time=DB_MAINTENANCE_IDLE_TIME, max_pages=DB_VACUUM_STEP_PAGES,
+                       freelist_threshold=DB_FREELIST_THRESHOLD):
+        """
+        Reclaims (at most max_pages) unused pages with an incremental vacuum step.
+        Runs only if the database was not accessed during the last idle_time seconds,
+        or if the freelist has grown above freelist_threshold pages.
+        Returns the number of pages reclaimed.
+        """
+        if not self.isOpen:
+            return 0
+        try:
+            # not using getCursor: maintenance must not count as activity
+            with self.lock:
+                conn = self.connect()
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            idle = time() - self.lastActivity > idle_time
+            if free_pages == 0 or not (idle or free_pages > freelist_threshold):
+                return 0
+            # (executescript steps the pragma to completion, execute would free a single page)
+            conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+            reclaimed = free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            logging.debug(f"DB: incremental vacuum reclaimed {reclaimed} of {free_pages} free pages")
+            return reclaimed
+
+        except Exception as e:
+            err_msg = 'error running incremental vacuum'
+            printException(getCallerName(), getFunctionName(), err_msg, e.args)
+            return 0
+
     def initTables(self):
         printDbg(f"DB: Initializing tables...")
         try:
-            cursor = self.conn.cursor()
+            cursor = self.connect().cursor()
 
             # Tables for RPC Servers
             cursor.execute("CREATE TABLE IF NOT EXISTS PUBLIC_RPC_SERVERS("
@@ -142,7 +269,7 @@ class Database():
                            " PRIMARY KEY (tx_hash, tx_ouput_n))")
 
             cursor.execute("CREATE TABLE IF NOT EXISTS RAWTXES("
-                           " tx_hash TEXT PRIMARY KEY,  rawtx TEXT, lastfetch INTEGER)")
+                           " tx_hash TEXT PRIMARY KEY,  rawtx BLOB, lastfetch INTEGER)")
 
             # Tables for Governance Objects
             cursor.execute("CREATE TABLE IF NOT EXISTS PROPOSALS("
@@ -166,6 +293,35 @@ class Database():
             err_msg = 'error initializing tables'
             printException(getCallerName(), getFunctionName(), err_msg, e.args)
 
+    def updateSchema(self):
+        """
+        Brings the schema from its PRAGMA user_version to len(SCHEMA_MIGRATIONS),
+        applying each missing migration step in its own transaction.
+        """
+        conn = self.connect()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > len(SCHEMA_MIGRATIONS):
+            printDbg(f"DB: schema version {version} is newer than this release ({len(SCHEMA_MIGRATIONS)})")
+            return
+
+        for new_version in range(version + 1, len(SCHEMA_MIGRATIONS) + 1):
+            printDbg(f"DB: Upgrading schema to version {new_version}...")
+            try:
+                conn.execute("BEGIN")
+                for statement in SCHEMA_MIGRATIONS[new_version - 1]:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {new_version}")
+                conn.commit()
+
+            except Exception:
+                conn.rollback()
+                raise
+
+        printDbg(f"DB: Schema version {len(SCHEMA_MIGRATIONS)}")
+
     def initTable_RPC(self, cursor):
         s = trusted_RPC_Servers
         # Insert Default public trusted servers
@@ -203,7 +359,7 @@ class Database():
             printException(getCallerName(), getFunctionName(), err_msg, e.args)
 
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
             if cleared_RPC:
                 self.app.sig_changed_rpcServers.emit()
 
@@ -219,7 +375,7 @@ class Database():
             printException(getCallerName(), getFunctionName(), err_msg, e.args)
 
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
 
     '''
     RPC servers methods
@@ -318,7 +474,7 @@ class Database():
             printException(getCallerName(), getFunctionName(), err_msg, e.args)
 
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
             if removed_RPC:
                 self.app.sig_changed_rpcServers.emit()
 
@@ -424,7 +580,7 @@ class Database():
             err_msg = 'error deleting masternode from DB'
             printException(getCallerName(), getFunctionName(), err_msg, e.args)
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
 
     '''
     Rewards methods
@@ -467,6 +623,56 @@ class Database():
         finally:
             self.releaseCursor()
 
+    def addRewards(self, utxos):
+        logging.debug("DB: Adding rewards")
+        rollingBack = False
+        try:
+            cursor = self.getCursor()
+
+            cursor.executemany("INSERT OR REPLACE INTO REWARDS "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               [(utxo['txid'], utxo['vout'], utxo['satoshis'], utxo['confirmations'],
+                                 utxo['script'], utxo['mn_name'], utxo['coinstake'], utxo['staker'])
+                                for utxo in utxos]
+                               )
+
+        except Exception as e:
+            err_msg = 'error adding reward UTXOs to DB'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+            rollingBack = True
+
+        finally:
+            self.releaseCursor(rollingBack)
+
+    def syncRewards(self, added, updated, removed):
+        """
+        Applies a UTXO set diff in a single transaction.
+        added: new reward utxos, updated: utxos whose confirmations changed,
+        removed: (tx_hash, tx_ouput_n) pairs of spent utxos
+        """
+        logging.debug(f"DB: Syncing rewards (+{len(added)} ~{len(updated)} -{len(removed)})")
+        rollingBack = False
+        try:
+            cursor = self.getCursor()
+
+            cursor.executemany("DELETE FROM REWARDS WHERE tx_hash = ? AND tx_ouput_n = ?", removed)
+            cursor.executemany("UPDATE REWARDS SET confirmations = ? WHERE tx_hash = ? AND tx_ouput_n = ?",
+                               [(utxo['confirmations'], utxo['txid'], utxo['vout']) for utxo in updated])
+            cursor.executemany("INSERT OR REPLACE INTO REWARDS "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               [(utxo['txid'], utxo['vout'], utxo['satoshis'], utxo['confirmations'],
+                                 utxo['script'], utxo['mn_name'], utxo['coinstake'], utxo['staker'])
+                                for utxo in added]
+                               )
+
+        except Exception as e:
+            err_msg = 'error syncing reward UTXOs to DB'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+            rollingBack = True
+
+        finally:
+            self.releaseCursor(rollingBack)
+
     def deleteReward(self, tx_hash, tx_ouput_n):
         logging.debug("DB: Deleting reward")
         try:
@@ -477,7 +683,7 @@ class Database():
             err_msg = 'error deleting UTXO from DB'
             printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e.args}")
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
 
     def getReward(self, tx_hash, tx_output_n):
         logging.debug("DB: Getting reward")
@@ -532,7 +738,7 @@ class Database():
             # fetch tx item
             tx = {}
             tx['txid'] = row[0]
-            tx['rawtx'] = row[1]
+            tx['rawtx'] = decodeRawTx(row[1])
             # add to list
             txes.append(tx)
 
@@ -540,13 +746,16 @@ class Database():
 
     def addRawTx(self, tx_hash, rawtx, lastfetch=0):
         logging.debug(f"DB: Adding rawtx for {tx_hash}")
+        added = 0
         try:
             cursor = self.getCursor()
 
+            blob = encodeRawTx(rawtx)
             cursor.execute("INSERT OR REPLACE INTO RAWTXES "
                            "VALUES (?, ?, ?)",
-                           (tx_hash, rawtx, lastfetch)
+                           (tx_hash, blob, lastfetch)
                            )
+            added = len(blob)
 
         except Exception as e:
             err_msg = f'error adding rawtx to DB'
@@ -554,6 +763,40 @@ class Database():
 
         finally:
             self.releaseCursor()
+        self.countRawTxes(added)
+
+    def addRawTxes(self, txes, lastfetch=0):
+        """
+        txes: iterable of (tx_hash, rawtx) pairs (rawtx as bytes or hex string), written in a single transaction
+        """
+        logging.debug("DB: Adding rawtxes")
+        rollingBack = False
+        added = 0
+        try:
+            cursor = self.getCursor()
+
+            rows = [(tx_hash, encodeRawTx(rawtx), lastfetch) for tx_hash, rawtx in txes]
+            cursor.executemany("INSERT OR REPLACE INTO RAWTXES "
+                               "VALUES (?, ?, ?)",
+                               rows
+                               )
+            added = sum(len(row[1]) for row in rows)
+
+        except Exception as e:
+            err_msg = 'error adding rawtxes to DB'
+            printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+            rollingBack = True
+            added = 0
+
+        finally:
+            self.releaseCursor(rollingBack)
+        self.countRawTxes(added)
+
+    def countRawTxes(self, added):
+        # called after the commit: a tx added during an exact count is counted at least once
+        with self.lock:
+            if self.rawTxesSize is not None:
+                self.rawTxesSize += added
 
     def deleteRawTx(self, tx_hash):
         logging.debug(f"DB: Deleting rawtx for {tx_hash}")
@@ -565,7 +808,7 @@ class Database():
             err_msg = 'error deleting rawtx from DB'
             printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e.args}")
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
 
     def getRawTx(self, tx_hash):
         logging.debug(f"DB: Getting rawtx for {tx_hash}")
@@ -587,20 +830,105 @@ class Database():
             return self.txes_from_rows(rows)[0]
         return None
 
-    def clearRawTxes(self, minTime):
+    def getRawTxes(self, tx_hashes):
         """
-        removes txes with lastfetch older than mintime
+        returns a dict tx_hash --> rawtx (bytes) with the cached txes among tx_hashes
         """
-        printDbg("Pruning table RAWTXES")
+        logging.debug("DB: Getting rawtxes")
+        tx_hashes = list(tx_hashes)
+        rows = []
         try:
             cursor = self.getCursor()
-            cursor.execute("DELETE FROM RAWTXES WHERE lastfetch < ?", (minTime,))
+
+            # keep below SQLITE_MAX_VARIABLE_NUMBER
+            for i in range(0, len(tx_hashes), 500):
+                chunk = tx_hashes[i:i + 500]
+                cursor.execute("SELECT * FROM RAWTXES"
+                               f" WHERE tx_hash IN ({','.join('?' * len(chunk))})", chunk)
+                rows += cursor.fetchall()
 
         except Exception as e:
-            err_msg = 'error deleting rawtx from DB'
-            printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e.args}")
+            err_msg = 'error getting raw txes'
+            printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+            rows = []
         finally:
-            self.releaseCursor(vacuum=True)
+            self.releaseCursor()
+
+        return {tx['txid']: tx['rawtx'] for tx in self.txes_from_rows(rows)}
+
+    def touchRawTxes(self, accessed):
+        """
+        saves the access times (dict tx_hash --> time) used for eviction, collected in memory
+        by the readers. each tx is updated at most once every RAWTXES_TOUCH_INTERVAL
+        """
+        if not self.isOpen or len(accessed) == 0:
+            return
+        logging.debug(f"DB: Saving access time of {len(accessed)} raw txes")
+        conn = None
+        try:
+            # not using getCursor: housekeeping must not count as activity
+            with self.lock:
+                conn = self.connect()
+            conn.executemany("UPDATE RAWTXES SET lastfetch = ? WHERE tx_hash = ? AND lastfetch < ?",
+                             [(int(t), tx_hash, int(t) - RAWTXES_TOUCH_INTERVAL) for tx_hash, t in accessed.items()])
+            conn.commit()
+
+        except Exception as e:
+            err_msg = 'error saving raw txes access time'
+            printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+            if conn is not None:
+                conn.rollback()
+
+    def evictRawTxes(self, max_bytes=RAWTXES_MAX_BYTES, pinned=(), max_rows=RAWTXES_EVICTION_STEP):
+        """
+        removes up to max_rows least recently used txes while the table is bigger than max_bytes.
+        txes of unspent rewards (REWARDS table) and pinned tx hashes are never removed.
+        returns the number of txes removed
+        """
+        if not self.isOpen:
+            return 0
+        with self.lock:
+            if self.rawTxesSize is not None and self.rawTxesSize <= max_bytes:
+                # within budget: nothing to read
+                return 0
+            # exact count (txes added meanwhile are counted from now on)
+            self.rawTxesSize = 0
+        pinned = set(pinned)
+        removed = []
+        conn = None
+        try:
+            # not using getCursor: housekeeping must not count as activity
+            with self.lock:
+                conn = self.connect()
+            cursor = conn.cursor()
+            size = cursor.execute("SELECT COALESCE(SUM(length(rawtx)), 0) FROM RAWTXES").fetchone()[0]
+            if size > max_bytes:
+                cursor.execute("SELECT tx_hash, length(rawtx) FROM RAWTXES"
+                               " WHERE tx_hash NOT IN (SELECT tx_hash FROM REWARDS)"
+                               " ORDER BY lastfetch LIMIT ?", (max_rows + len(pinned),))
+                for tx_hash, length in cursor.fetchall():
+                    if size <= max_bytes or len(removed) >= max_rows:
+                        break
+                    if tx_hash not in pinned:
+                        removed.append((tx_hash,))
+                        size -= length
+                cursor.executemany("DELETE FROM RAWTXES WHERE tx_hash = ?", removed)
+            conn.commit()
+            with self.lock:
+                self.rawTxesSize += size
+
+        except Exception as e:
+            err_msg = 'error evicting rawtxes'
+            printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+            if conn is not None:
+                conn.rollback()
+            removed = []
+            with self.lock:
+                self.rawTxesSize = None
+
+        if len(removed) > 0:
+            printDbg(f"DB: Evicted {len(removed)} raw txes")
+        return len(removed)
 
     '''
     Proposals methods
@@ -669,6 +997,28 @@ class Database():
         finally:
             self.releaseCursor()
 
+    def addProposals(self, proposals):
+        logging.debug("DB: Adding proposals")
+        rollingBack = False
+        try:
+            cursor = self.getCursor()
+
+            cursor.executemany("INSERT OR REPLACE INTO PROPOSALS "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               [(p.name, p.URL, p.Hash, p.FeeHash, p.BlockStart, p.BlockEnd,
+                                 p.TotalPayCount, p.RemainingPayCount, p.PaymentAddress,
+                                 p.Yeas, p.Nays, p.Abstains, p.ToalPayment, p.MonthlyPayment)
+                                for p in proposals]
+                               )
+
+        except Exception as e:
+            err_msg = 'error adding proposals to DB'
+            printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+            rollingBack = True
+
+        finally:
+            self.releaseCursor(rollingBack)
+
     def getMyVotes(self, p_hash=None):
         try:
             cursor = self.getCursor()
@@ -705,3 +1055,94 @@ class Database():
             self.releaseCursor()
 
         return self.proposals_from_rows(rows)
+
+    '''
+    Jobs methods
+    '''
+
+    def getCheckpoint(self, job_key, max_age=JOBS_CHECKPOINT_TTL):
+        """
+        returns the checkpoint saved by the last run of the job (None if older than max_age)
+        """
+        logging.debug(f"DB: Getting checkpoint of job {job_key}")
+        try:
+            cursor = self.getCursor()
+
+            cursor.execute("SELECT checkpoint FROM JOBS WHERE job_key = ? AND updated >= ?",
+                           (job_key, int(time()) - max_age))
+            row = cursor.fetchone()
+
+        except Exception as e:
+            err_msg = 'error getting job checkpoint'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+            row = None
+        finally:
+            self.releaseCursor()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def saveCheckpoint(self, job_key, checkpoint):
+        logging.debug(f"DB: Saving checkpoint of job {job_key}")
+        try:
+            cursor = self.getCursor()
+
+            cursor.execute("INSERT OR REPLACE INTO JOBS VALUES (?, ?, ?)",
+                           (job_key, json.dumps(checkpoint), int(time())))
+
+        except Exception as e:
+            err_msg = 'error saving job checkpoint'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+
+        finally:
+            self.releaseCursor()
+
+    def deleteCheckpoint(self, job_key):
+        logging.debug(f"DB: Deleting checkpoint of job {job_key}")
+        try:
+            cursor = self.getCursor()
+            cursor.execute("DELETE FROM JOBS WHERE job_key = ?", (job_key,))
+
+        except Exception as e:
+            err_msg = 'error deleting job checkpoint'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+
+        finally:
+            self.releaseCursor()
+
+    def getCheckpoints(self, prefix, max_age=JOBS_CHECKPOINT_TTL):
+        """
+        returns a dict job_key --> checkpoint of the jobs with key starting with prefix
+        """
+        logging.debug(f"DB: Getting checkpoints of jobs {prefix}*")
+        try:
+            cursor = self.getCursor()
+
+            cursor.execute("SELECT job_key, checkpoint FROM JOBS"
+                           " WHERE substr(job_key, 1, ?) = ? AND updated >= ?",
+                           (len(prefix), prefix, int(time()) - max_age))
+            rows = cursor.fetchall()
+
+        except Exception as e:
+            err_msg = 'error getting job checkpoints'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+            rows = []
+        finally:
+            self.releaseCursor()
+
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def clearCheckpoints(self, minTime):
+        """
+        removes checkpoints updated before minTime
+        """
+        printDbg("Pruning table JOBS")
+        try:
+            cursor = self.getCursor()
+            cursor.execute("DELETE FROM JOBS WHERE updated < ?", (minTime,))
+
+        except Exception as e:
+            err_msg = 'error deleting job checkpoints'
+            printException(getCallerName(), getFunctionName(), err_msg, e)
+
+        finally:
+            self.releaseCursor()
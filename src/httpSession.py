@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+from collections import deque
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from constants import API_MAX_WORKERS, API_MAX_REQ_PER_SEC, API_REQUEST_TIMEOUT, API_MAX_RETRIES, \
+    API_BACKOFF_BASE, API_STATS_WINDOW
+from misc import printDbg
+
+# status codes worth retrying
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class RateLimiter(object):
+    """
+    Thread-safe limiter spacing the requests sent to each host
+    (at most max_rate per second per host).
+    """
+    def __init__(self, max_rate):
+        self.interval = 1.0 / max_rate
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            t = time.monotonic()
+            slot = max(t, self.next_slot.get(host, t))
+            self.next_slot[host] = slot + self.interval
+        if slot > t:
+            time.sleep(slot - t)
+
+
+class LatencyStats(object):
+    """
+    Rolling stats of the last `window` requests to an endpoint
+    """
+    def __init__(self, window=API_STATS_WINDOW):
+        self.samples = deque(maxlen=window)  # (latency, success)
+        self.count = 0
+        self.errors = 0
+        self.lastError = None
+
+    def record(self, latency, error=None):
+        self.samples.append((latency, error is None))
+        self.count += 1
+        if error is not None:
+            self.errors += 1
+            self.lastError = error
+
+    def percentile(self, p):
+        latencies = sorted(s[0] for s in self.samples)
+        if len(latencies) == 0:
+            return None
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    def successRate(self):
+        if len(self.samples) == 0:
+            return None
+        return sum(1 for s in self.samples if s[1]) / len(self.samples)
+
+    def toDict(self):
+        return {'count': self.count, 'errors': self.errors, 'success_rate': self.successRate(),
+                'p50': self.percentile(0.5), 'p95': self.percentile(0.95), 'last_error': self.lastError}
+
+
+class HttpSession(object):
+    """
+    Pooled keep-alive requests.Session shared by the explorer clients, with
+    (connect, read) timeouts, per-host rate limit, retries with exponential backoff
+    and jitter, and per-endpoint latency stats.
+    """
+    def __init__(self, timeout=API_REQUEST_TIMEOUT, max_retries=API_MAX_RETRIES, backoff=API_BACKOFF_BASE,
+                 max_rate=API_MAX_REQ_PER_SEC, pool_size=API_MAX_WORKERS):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rateLimiter = RateLimiter(max_rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, endpoint, latency, error=None):
+        with self.lock:
+            if endpoint not in self.stats:
+                self.stats[endpoint] = LatencyStats()
+            self.stats[endpoint].record(latency, error)
+
+    def get(self, url, endpoint=None, **kwargs):
+        """
+        GET with retries. Raises the last exception if every attempt fails to connect,
+        otherwise returns the response (possibly with an error status).
+        endpoint: key of the latency stats (default: host and path of the url)
+        """
+        if endpoint is None:
+            o = urlparse(url)
+            endpoint = f"{o.netloc}{o.path}"
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            self.rateLimiter.wait(url)
+            start = time.monotonic()
+            try:
+                resp = self.session.get(url, **kwargs)
+                error = f"HTTP {resp.status_code}" if resp.status_code in RETRY_STATUS else None
+                self.record(endpoint, time.monotonic() - start, error)
+                if error is None or attempt == self.max_retries:
+                    return resp
+            except requests.exceptions.RequestException as e:
+                error = f"{e.__class__.__name__}"
+                self.record(endpoint, time.monotonic() - start, error)
+                if attempt == self.max_retries:
+                    raise
+
+            # exponential backoff with full jitter
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            printDbg(f"{endpoint}: {error} - retrying in {delay:.2f} sec")
+            time.sleep(delay)
+            attempt += 1
+
+    def getStats(self):
+        """
+        returns a dict endpoint --> {count, errors, success_rate, p50, p95, last_error}
+        """
+        with self.lock:
+            return {endpoint: stats.toDict() for endpoint, stats in self.stats.items()}
+
+
+# shared by the explorer clients
+api_session = HttpSession()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import threading
+
+from misc import printDbg
+from threads import ThreadFuns, QUEUE_NETWORK, PRIORITY_GUI
+from workerThread import CtrlObject
+
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+
+
+class Job(CtrlObject):
+    """
+    Control object of a background job (passed as ctrl to the thread function).
+    The checkpoint of an interrupted job is saved in the database and passed again
+    to the next job with the same key, which continues from there.
+    """
+    def __init__(self, key, db, checkpoint=None):
+        super().__init__()
+        self.key = key
+        self.db = db
+        self.status = JOB_RUNNING
+        self.cancelled = False
+        self.thread = None
+        self.checkpoint = checkpoint if checkpoint is not None else {}
+
+    def saveCheckpoint(self):
+        if self.db is not None:
+            self.db.saveCheckpoint(self.key, self.checkpoint)
+
+    def toDict(self):
+        return {'key': self.key, 'status': self.status, 'progress': self.progress}
+
+
+class JobManager:
+    """
+    Runs the background jobs of the tabs through ThreadFuns.runInThread:
+    - a job submitted while another one with the same key is running is not started
+      (the running one is returned instead)
+    - cancel(key) sets ctrl.finish, checked by the thread function
+    - a cancelled or failed job keeps its checkpoint, a completed one deletes it
+    """
+    def __init__(self, db=None):
+        self.db = db
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def submit(self, key, worker_fun, worker_fun_args=(), on_thread_finish=None, on_thread_exception=None,
+               queue=QUEUE_NETWORK, priority=PRIORITY_GUI):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and job.status == JOB_RUNNING:
+                printDbg(f"Job {key} already running ({job.progress}%)")
+                return job
+            checkpoint = self.db.getCheckpoint(key) if self.db is not None else None
+            if checkpoint:
+                printDbg(f"Job {key}: resuming from checkpoint")
+            job = Job(key, self.db, checkpoint)
+            self.jobs[key] = job
+
+        def run(ctrl, *args):
+            try:
+                res = worker_fun(ctrl, *args)
+            except Exception:
+                self.finished(ctrl, JOB_FAILED)
+                raise
+            self.finished(ctrl, JOB_CANCELLED if ctrl.finish else JOB_DONE)
+            return res
+
+        job.thread = ThreadFuns.runInThread(run, worker_fun_args, on_thread_finish, on_thread_exception,
+                                            ctrl_obj=job, queue=queue, priority=priority)
+        return job
+
+    def finished(self, job, status):
+        if status == JOB_CANCELLED and not job.cancelled:
+            # stopped by an error in the worker thread
+            status = JOB_FAILED
+        with self.lock:
+            job.status = status
+        if status == JOB_DONE:
+            job.setProgress(100)
+            if self.db is not None:
+                self.db.deleteCheckpoint(job.key)
+        else:
+            job.saveCheckpoint()
+        printDbg(f"Job {job.key} {status}")
+
+    def cancel(self, key):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None or job.status != JOB_RUNNING:
+                return False
+            job.cancelled = True
+            job.finish = True
+        printDbg(f"Job {key} cancel requested")
+        return True
+
+    def cancelAll(self):
+        with self.lock:
+            keys = [key for key, job in self.jobs.items() if job.status == JOB_RUNNING]
+        for key in keys:
+            self.cancel(key)
+
+    def isRunning(self, key):
+        with self.lock:
+            return key in self.jobs and self.jobs[key].status == JOB_RUNNING
+
+    def getJobs(self):
+        """
+        returns a list of {key, status, progress} of the jobs submitted
+        """
+        with self.lock:
+            return [job.toDict() for job in self.jobs.values()]
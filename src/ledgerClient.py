@@ -18,7 +18,7 @@ from PyQt5.QtWidgets import QMessageBox, QApplication
 from constants import MPATH_LEDGER as MPATH, MPATH_TESTNET, HW_devices
 from misc import printDbg, printException, printOK, getCallerName, getFunctionName, splitString, DisconnectedException
 from pivx_hashlib import pubkey_to_address, single_sha256
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_HWDEVICE
 from txCache import TxCache
 from utils import extract_pkh_from_locking_script, compose_tx_locking_script
 
@@ -124,7 +124,7 @@ class LedgerApi(QObject):
         raw_tx = TxCache(self.main_wnd)[utxo['txid']]
 
         # parse the raw transaction, so that we can extract the UTXO locking script we refer to
-        prev_transaction = bitcoinTransaction(bytearray.fromhex(raw_tx))
+        prev_transaction = bitcoinTransaction(bytearray(raw_tx))
 
         utxo_tx_index = utxo['vout']
         if utxo_tx_index < 0 or utxo_tx_index > len(prev_transaction.outputs):
@@ -163,6 +163,8 @@ class LedgerApi(QObject):
             self.amount = 0
             num_of_sigs = sum([len(mnode['utxos']) for mnode in rewardsArray])
             curr_utxo_checked = 0
+            # load all the previous txes in the cache at once
+            TxCache(self.main_wnd).get_many(utxo['txid'] for mnode in rewardsArray for utxo in mnode['utxos'])
 
             for mnode in rewardsArray:
                 # Add proper HW path (for current device) on each utxo
@@ -212,7 +214,7 @@ class LedgerApi(QObject):
             self.mBox2.setMaximumWidth(500)
             self.mBox2.show()
 
-        ThreadFuns.runInThread(self.signTxSign, (), self.signTxFinish)
+        ThreadFuns.runInThread(self.signTxSign, (), self.signTxFinish, queue=QUEUE_HWDEVICE)
 
     @process_ledger_exceptions
     def scanForAddress(self, account, spath, isTestnet=False):
@@ -284,7 +286,7 @@ class LedgerApi(QObject):
             self.mBox.show()
 
         # Sign message
-        ThreadFuns.runInThread(self.signMessageSign, (), self.signMessageFinish)
+        ThreadFuns.runInThread(self.signMessageSign, (), self.signMessageFinish, queue=QUEUE_HWDEVICE)
 
     @process_ledger_exceptions
     def signMessageSign(self, ctrl):
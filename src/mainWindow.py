@@ -16,6 +16,7 @@ from PyQt5.QtWidgets import QWidget, QPushButton, QHBoxLayout, QGroupBox, QVBoxL
 from apiClient import ApiClient
 from constants import starting_height, DefaultCache, wqueue
 from hwdevice import HWdevice
+from jobManager import JobManager
 from misc import printDbg, printException, printOK, getCallerName, getFunctionName, \
     WriteStreamReceiver, now, getRemoteSPMTversion, loadMNConfFile, \
     persistCacheSetting, appendMasternode, myPopUp_sb
@@ -25,8 +26,9 @@ from tabMNConf import TabMNConf
 from tabRewards import TabRewards
 from qt.guiHeader import GuiHeader
 from rpcClient import RpcClient
-from threads import ThreadFuns
-from watchdogThreads import RpcWatchdog
+from threads import ThreadFuns, QUEUE_NETWORK, PRIORITY_GUI, PRIORITY_BACKGROUND
+from txCache import TxCache
+from watchdogThreads import RpcWatchdog, DbWatchdog
 
 
 class MainWindow(QWidget):
@@ -51,6 +53,8 @@ class MainWindow(QWidget):
         self.imgDir = imgDir
         self.runInThread = ThreadFuns.runInThread
         self.lock = threading.Lock()
+        # -- Background jobs of the tabs (cancellable, deduplicated, resumable)
+        self.jobs = JobManager(self.parent.db)
 
         # -- Masternode list
         self.masternode_list = masternode_list
@@ -138,7 +142,7 @@ class MainWindow(QWidget):
         self.connButtons()
 
         # -- Check version
-        self.onCheckVersion()
+        self.onCheckVersion(PRIORITY_BACKGROUND)
 
         # -- Create RPC Whatchdog
         self.rpc_watchdogThread = QThread()
@@ -146,6 +150,13 @@ class MainWindow(QWidget):
         self.myRpcWd.moveToThread(self.rpc_watchdogThread)
         self.rpc_watchdogThread.started.connect(self.myRpcWd.run)
 
+        # -- Create DB maintenance Watchdog
+        self.db_watchdogThread = QThread()
+        self.myDbWd = DbWatchdog(self.parent.db, lambda: [mn['collateral'].get('txid') for mn in self.masternode_list],
+                                 lambda: TxCache(self).pop_accessed())
+        self.myDbWd.moveToThread(self.db_watchdogThread)
+        self.db_watchdogThread.started.connect(self.myDbWd.run)
+
         # -- Let's go
         self.mnode_to_change = None
         printOK(f"Hello! Welcome to {parent.title}")
@@ -298,12 +309,12 @@ class MainWindow(QWidget):
         self.showHWstatus()
 
     def onCheckRpc(self):
-        self.runInThread(self.updateRPCstatus, (True,), )
+        self.runInThread(self.updateRPCstatus, (True,), queue=QUEUE_NETWORK, priority=PRIORITY_GUI)
 
-    def onCheckVersion(self):
+    def onCheckVersion(self, priority=PRIORITY_GUI):
         printDbg("Checking SPMT version...")
         self.versionLabel.setText("--")
-        self.runInThread(self.checkVersion, (), self.updateVersion)
+        self.runInThread(self.checkVersion, (), self.updateVersion, priority=priority)
 
     def checkVersion(self, ctrl):
         local_version = self.parent.version['number'].split('.')
@@ -336,7 +347,7 @@ class MainWindow(QWidget):
         if not self.updatingRPCbox:
             # persist setting
             self.parent.cache['selectedRPC_index'] = persistCacheSetting('cache_RPCindex', i)
-            self.runInThread(self.updateRPCstatus, (True,), )
+            self.runInThread(self.updateRPCstatus, (True,), queue=QUEUE_NETWORK, priority=PRIORITY_GUI)
 
     def onCleanConsole(self):
         self.consoleArea.clear()
@@ -363,6 +374,8 @@ class MainWindow(QWidget):
         if self.tabs.currentWidget() == self.tabRewards:
             # reload last used address
             self.tabRewards.destinationLine.setText(self.parent.cache.get("lastAddress"))
+            # update the saved rewards
+            self.t_rewards.reloadStaleUTXOs()
 
         # tabGovernace
         if self.tabs.currentWidget() == self.tabGovernance:
@@ -401,6 +414,8 @@ class MainWindow(QWidget):
         # Update displayed status only if selected server is not changed
         if server_index == self.header.rpcClientsBox.currentIndex():
             self.updateRPCled(fDebug)
+            # update the saved rewards once connected
+            self.t_rewards.reloadStaleUTXOs()
             if fDebug:
                 myPopUp_sb(self, "info", 'SPMT - rpc check', f"{self.rpcStatusMess}")
 
@@ -511,9 +526,10 @@ class MainWindow(QWidget):
             printDbg(f"Trying to connect to RPC {rpc_protocol}://{rpc_host}...")
 
         try:
-            rpcClient = RpcClient(rpc_protocol, rpc_host, rpc_user, rpc_password)
-            status, statusMess, lastBlock, r_time1, isTestnet = rpcClient.getStatus()
-            isBlockchainSynced, r_time2 = rpcClient.isBlockchainSynced()
+            rpcClient = self.rpcClient
+            if rpcClient is None or rpcClient.rpc_params != (rpc_protocol, rpc_host, rpc_user, rpc_password):
+                rpcClient = RpcClient(rpc_protocol, rpc_host, rpc_user, rpc_password)
+            status, statusMess, lastBlock, r_time, isTestnet, isBlockchainSynced = rpcClient.getStatusAndSync()
         except Exception as e:
             printException(getCallerName(), getFunctionName(), f"exception updating RPC status: {e}")
             # clear status
@@ -522,8 +538,8 @@ class MainWindow(QWidget):
             return
 
         rpcResponseTime = None
-        if r_time1 is not None and r_time2 != 0:
-            rpcResponseTime = round((r_time1 + r_time2) / 2, 3)
+        if r_time is not None:
+            rpcResponseTime = round(r_time, 3)
 
         # Do not update status if the user has selected a different server since the start of updateRPCStatus()
         if rpc_index != self.header.rpcClientsBox.currentIndex():
@@ -540,5 +556,8 @@ class MainWindow(QWidget):
             if isTestnet != self.isTestnetRPC:
                 self.isTestnetRPC = isTestnet
                 self.parent.cache['isTestnetRPC'] = persistCacheSetting('isTestnetRPC', isTestnet)
+                self.apiClient.close()
                 self.apiClient = ApiClient(isTestnet)
+            if status:
+                self.apiClient.setBlockHeight(lastBlock)
         self.sig_RPCstatusUpdated.emit(rpc_index, fDebug)
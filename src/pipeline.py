@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+from queue import Queue, Empty, Full
+import threading
+import time
+
+from constants import PIPELINE_QUEUE_SIZE
+from misc import printDbg
+
+# end of the stream (one for each worker of the next stage)
+STOP = object()
+# seconds between two checks of the cancellation flags while blocked on a queue
+POLL_INTERVAL = 0.1
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class Stage:
+    """
+    Step of a Pipeline: `workers` threads calling fun(item, emit) for each item of the
+    input queue (or fun(items, emit) with lists of up to `batch_size` items) and passing
+    the results to the next stage with emit(result)
+    """
+    def __init__(self, name, fun, workers=1, batch_size=None):
+        self.name = name
+        self.fun = fun
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue = None
+        self.running = workers
+        self.items = 0
+        self.busy = 0.0
+        self.start = None
+        self.end = None
+
+    def toDict(self):
+        wall = (self.end or time.monotonic()) - self.start if self.start is not None else 0.0
+        return {'items': self.items, 'busy': self.busy, 'wall': wall}
+
+
+class Pipeline:
+    """
+    Chain of stages connected by bounded queues (a slow stage blocks the previous ones
+    instead of buffering the whole stream).
+    The pipeline is cancelled when ctrl.finish is set, when cancel() is called,
+    or when a stage raises (the exception is re-raised by run).
+    The stage threads are started by run, not taken from the shared ThreadPool: all the
+    stages must run at once (a stage waiting in a pool queue would block the previous ones).
+    """
+    def __init__(self, name, ctrl=None, queue_size=PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self.ctrl = ctrl
+        self.queue_size = queue_size
+        self.stages = []
+        self.lock = threading.Lock()
+        self.cancelFlag = threading.Event()
+        self.error = None
+
+    def addStage(self, name, fun, workers=1, batch_size=None):
+        self.stages.append(Stage(name, fun, workers, batch_size))
+        return self
+
+    def cancel(self):
+        self.cancelFlag.set()
+
+    def isCancelled(self):
+        if self.ctrl is not None and getattr(self.ctrl, 'finish', False):
+            self.cancelFlag.set()
+        return self.cancelFlag.is_set()
+
+    def put(self, q, item):
+        while not self.isCancelled():
+            try:
+                q.put(item, timeout=POLL_INTERVAL)
+                return
+            except Full:
+                pass
+        raise PipelineCancelled()
+
+    def get(self, q):
+        while not self.isCancelled():
+            try:
+                return q.get(timeout=POLL_INTERVAL)
+            except Empty:
+                pass
+        raise PipelineCancelled()
+
+    def emitter(self, i):
+        if i + 1 == len(self.stages):
+            # output of the last stage is discarded
+            return lambda item: None
+        return lambda item: self.put(self.stages[i + 1].queue, item)
+
+    def worker(self, i):
+        stage = self.stages[i]
+        emit = self.emitter(i)
+        try:
+            stopped = False
+            while not stopped:
+                item = self.get(stage.queue)
+                if item is STOP:
+                    break
+                if stage.batch_size is not None:
+                    # collect the items already queued, up to batch_size
+                    item = [item]
+                    while len(item) < stage.batch_size:
+                        try:
+                            next_item = stage.queue.get_nowait()
+                        except Empty:
+                            break
+                        if next_item is STOP:
+                            stopped = True
+                            break
+                        item.append(next_item)
+                if self.isCancelled():
+                    raise PipelineCancelled()
+                start = time.monotonic()
+                stage.fun(item, emit)
+                with self.lock:
+                    stage.busy += time.monotonic() - start
+                    stage.items += len(item) if stage.batch_size is not None else 1
+
+        except PipelineCancelled:
+            return
+
+        except Exception as e:
+            with self.lock:
+                if self.error is None:
+                    self.error = e
+            self.cancel()
+            return
+
+        # last worker of the stage: close the stream of the next one
+        with self.lock:
+            stage.running -= 1
+            last = stage.running == 0
+            if last:
+                stage.end = time.monotonic()
+        if last and i + 1 < len(self.stages):
+            try:
+                for _ in range(self.stages[i + 1].workers):
+                    self.put(self.stages[i + 1].queue, STOP)
+            except PipelineCancelled:
+                pass
+
+    def run(self, items):
+        """
+        Feeds items to the first stage and waits for the last one.
+        Returns True if the whole stream was processed, False if cancelled.
+        """
+        threads = []
+        start = time.monotonic()
+        for i, stage in enumerate(self.stages):
+            stage.queue = Queue(maxsize=self.queue_size)
+            stage.start = start
+            for n in range(stage.workers):
+                t = threading.Thread(target=self.worker, args=(i,), name=f"{self.name}-{stage.name}-{n}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        try:
+            for item in items:
+                self.put(self.stages[0].queue, item)
+            for _ in range(self.stages[0].workers):
+                self.put(self.stages[0].queue, STOP)
+        except PipelineCancelled:
+            pass
+
+        for t in threads:
+            t.join()
+
+        self.logStats(time.monotonic() - start)
+        if self.error is not None:
+            raise self.error
+        return not self.isCancelled()
+
+    def getStats(self):
+        """
+        returns a dict stage --> {items, busy, wall} (busy: seconds spent in the stage function
+        by all its workers, wall: seconds until the stage was done)
+        """
+        with self.lock:
+            return {stage.name: stage.toDict() for stage in self.stages}
+
+    def logStats(self, elapsed):
+        status = "cancelled" if self.isCancelled() else "done"
+        printDbg(f"Pipeline {self.name} {status} in {elapsed:.3f} sec")
+        for name, stats in self.getStats().items():
+            printDbg(f"  {name}: {stats['items']} items - busy {stats['busy']:.3f} sec - wall {stats['wall']:.3f} sec")
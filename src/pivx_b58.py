@@ -6,65 +6,73 @@
 # Distributed under the MIT software license, see the accompanying
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
+import hashlib
+
 __b58chars = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
 __b58base = len(__b58chars)
+__b58values = {c: i for i, c in enumerate(__b58chars)}
 b58chars = __b58chars
 
-long = int
-_bchr = lambda x: bytes([x])
-_bord = lambda x: x
-
 
 def b58encode(v):
     """
     encode v, which is a string of bytes, to base58.
     """
-    long_value = 0
-    for (i, c) in enumerate(v[::-1]):
-        long_value += (256 ** i) * _bord(c)
-
-    result = ''
-    while long_value >= __b58base:
-        div, mod = divmod(long_value, __b58base)
-        result = __b58chars[mod] + result
-        long_value = div
-    result = __b58chars[long_value] + result
+    long_value = int.from_bytes(v, byteorder='big')
+    # digits written backwards into a preallocated buffer
+    # (log(256) / log(58) < 1.37 base58 digits per byte)
+    digits = bytearray(len(v) * 138 // 100 + 1)
+    i = len(digits)
+    while long_value > 0:
+        long_value, mod = divmod(long_value, __b58base)
+        i -= 1
+        digits[i] = mod
     # Bitcoin does a little leading-zero-compression:
     # leading 0-bytes in the input become leading-1s
-    nPad = 0
-    for c in v:
-        #        if c == '\0': nPad += 1
-        if c == 0:
-            nPad += 1
-        else:
-            break
+    nPad = len(v) - len(bytes(v).lstrip(b'\0'))
 
-    return (__b58chars[0] * nPad) + result
+    return (__b58chars[0] * nPad) + ''.join([__b58chars[d] for d in digits[i:]])
 
 
 def b58decode(v, length=None):
     """ decode v into a string of len bytes
+        (None if v contains non-base58 chars or the length doesn't match)
     """
     long_value = 0
-    for (i, c) in enumerate(v[::-1]):
-        long_value += __b58chars.find(c) * (__b58base ** i)
-
-    result = bytes()
-    while long_value >= 256:
-        div, mod = divmod(long_value, 256)
-        result = _bchr(mod) + result
-        long_value = div
-    result = _bchr(long_value) + result
-
-    nPad = 0
-    for c in v:
-        if c == __b58chars[0]:
-            nPad += 1
-        else:
-            break
+    try:
+        for c in v:
+            long_value = long_value * __b58base + __b58values[c]
+    except KeyError:
+        return None
 
-    result = _bchr(0) * nPad + result
+    nPad = len(v) - len(v.lstrip(__b58chars[0]))
+    result = bytes(nPad) + long_value.to_bytes((long_value.bit_length() + 7) // 8, byteorder='big')
     if length is not None and len(result) != length:
         return None
 
     return result
+
+
+def b58check_encode(data):
+    """
+    encode data, appending its 4-bytes double-sha256 checksum, to base58.
+    """
+    checksum = hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+    return b58encode(data + checksum)
+
+
+def b58check_decode(v, length=None):
+    """ decode v and verify its 4-bytes double-sha256 checksum.
+        Returns the payload (without checksum), or None if v is not valid base58check
+        (or the payload is not len bytes)
+    """
+    result = b58decode(v)
+    if result is None or len(result) < 4:
+        return None
+    data, checksum = result[:-4], result[-4:]
+    if hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4] != checksum:
+        return None
+    if length is not None and len(data) != length:
+        return None
+
+    return data
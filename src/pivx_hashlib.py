@@ -7,11 +7,12 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 import bitcoin
+from functools import lru_cache
 import hashlib
 
-from constants import WIF_PREFIX, MAGIC_BYTE, TESTNET_WIF_PREFIX, TESTNET_MAGIC_BYTE, \
+from constants import ADDRESS_CACHE_SIZE, WIF_PREFIX, MAGIC_BYTE, TESTNET_WIF_PREFIX, TESTNET_MAGIC_BYTE, \
     STAKE_MAGIC_BYTE, TESTNET_STAKE_MAGIC_BYTE
-from pivx_b58 import b58encode, b58decode
+from pivx_b58 import b58check_encode, b58check_decode
 
 
 def double_sha256(data):
@@ -38,8 +39,7 @@ def generate_privkey(isTestnet=False):
 def base58fromhex(hexstr, isTestnet):
     base58_secret = TESTNET_WIF_PREFIX if isTestnet else WIF_PREFIX
     data = bytes([base58_secret]) + bytes.fromhex(hexstr)
-    checksum = bitcoin.bin_dbl_sha256(data)[0:4]
-    return b58encode(data + checksum)
+    return b58check_encode(data)
 
 
 def pubkey_to_address(pubkey, isTestnet=False, isCold=False):
@@ -48,32 +48,28 @@ def pubkey_to_address(pubkey, isTestnet=False, isCold=False):
     return pubkeyhash_to_address(pkey_hash, isTestnet, isCold)
 
 
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
 def pubkeyhash_to_address(pkey_hash, isTestnet=False, isCold=False):
+    # memoized: the same collateral / staker hashes are found in many outputs (pkey_hash must be bytes)
     if isCold:
         base58_secret = TESTNET_STAKE_MAGIC_BYTE if isTestnet else STAKE_MAGIC_BYTE
     else:
         base58_secret = TESTNET_MAGIC_BYTE if isTestnet else MAGIC_BYTE
     data = bytes([base58_secret]) + pkey_hash
-    checksum = bitcoin.bin_dbl_sha256(data)[0:4]
-    return b58encode(data + checksum)
+    return b58check_encode(data)
 
 
 def wif_to_privkey(string):
     wif_compressed = 52 == len(string)
-    pvkeyencoded = b58decode(string).hex()
-    wifversion = pvkeyencoded[:2]
-    checksum = pvkeyencoded[-8:]
-    vs = bytes.fromhex(pvkeyencoded[:-8])
-    check = double_sha256(vs)[0:4]
+    data = b58check_decode(string)
 
-    if (wifversion == WIF_PREFIX.to_bytes(1, byteorder='big').hex() and checksum == check.hex()) \
-            or (wifversion == TESTNET_WIF_PREFIX.to_bytes(1, byteorder='big').hex() and checksum == check.hex()):
+    if data is not None and data[0] in (WIF_PREFIX, TESTNET_WIF_PREFIX):
 
         if wif_compressed:
-            privkey = pvkeyencoded[2:-10]
+            privkey = data[1:-1].hex()
 
         else:
-            privkey = pvkeyencoded[2:-8]
+            privkey = data[1:].hex()
 
         return privkey
 
@@ -4,43 +4,65 @@
 # Distributed under the MIT software license, see the accompanying
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
+import struct
+
 from misc import getCallerName, getFunctionName, printException
 import utils
 from pivx_hashlib import pubkeyhash_to_address
 
 
-class HexParser():
-    def __init__(self, hex_str):
+UINT16 = struct.Struct("<H")
+UINT32 = struct.Struct("<I")
+UINT64 = struct.Struct("<Q")
+
+
+class TxParser():
+    """
+    Reads a serialized transaction (bytes, bytearray or hex string)
+    through a memoryview, without copying it.
+    """
+    def __init__(self, rawtx):
+        if isinstance(rawtx, str):
+            rawtx = bytes.fromhex(rawtx)
+        self.buf = memoryview(rawtx)
         self.cursor = 0
-        self.hex_str = hex_str
-
-    def readInt(self, nbytes, byteorder="big", signed=False):
-        if self.cursor + nbytes * 2 > len(self.hex_str):
-            raise Exception("HexParser range error")
-        b = bytes.fromhex(self.hex_str[self.cursor:self.cursor + nbytes * 2])
-        res = int.from_bytes(b, byteorder=byteorder, signed=signed)
-        self.cursor += nbytes * 2
+
+    def read(self, nbytes):
+        end = self.cursor + nbytes
+        if end > len(self.buf):
+            raise Exception("TxParser range error")
+        res = self.buf[self.cursor:end]
+        self.cursor = end
+        return res
+
+    def readStruct(self, st):
+        if self.cursor + st.size > len(self.buf):
+            raise Exception("TxParser range error")
+        res = st.unpack_from(self.buf, self.cursor)[0]
+        self.cursor += st.size
         return res
 
+    def readUInt32(self):
+        return self.readStruct(UINT32)
+
+    def readUInt64(self):
+        return self.readStruct(UINT64)
+
     def readVarInt(self):
-        r = self.readInt(1)
+        r = self.read(1)[0]
         if r == 253:
-            return self.readInt(2, "little")
+            return self.readStruct(UINT16)
         elif r == 254:
-            return self.readInt(4, "little")
+            return self.readStruct(UINT32)
         elif r == 255:
-            return self.readInt(8, "little")
+            return self.readStruct(UINT64)
         return r
 
-    def readString(self, nbytes, byteorder="big"):
-        if self.cursor + nbytes * 2 > len(self.hex_str):
-            raise Exception("HexParser range error")
-        res = self.hex_str[self.cursor:self.cursor + nbytes * 2]
-        self.cursor += nbytes * 2
+    def readHex(self, nbytes, byteorder="big"):
+        res = self.read(nbytes)
         if byteorder == "little":
-            splits = [res[i:i + 2] for i in range(0, len(res), 2)]
-            return ''.join(splits[::-1])
-        return res
+            return res[::-1].hex()
+        return res.hex()
 
 
 def IsCoinBase(vin):
@@ -49,12 +71,12 @@ def IsCoinBase(vin):
 
 def ParseTxInput(p):
     vin = {}
-    vin["txid"] = p.readString(32, "little")
-    vin["vout"] = p.readInt(4, "little")
+    vin["txid"] = p.readHex(32, "little")
+    vin["vout"] = p.readUInt32()
     script_len = p.readVarInt()
     vin["scriptSig"] = {}
-    vin["scriptSig"]["hex"] = p.readString(script_len, "big")
-    vin["sequence"] = p.readInt(4, "little")
+    vin["scriptSig"]["hex"] = p.readHex(script_len)
+    vin["sequence"] = p.readUInt32()
     if IsCoinBase(vin):
         del vin["txid"]
         del vin["vout"]
@@ -64,18 +86,17 @@ def ParseTxInput(p):
     return vin
 
 
-def ParseTxOutput(p, isTestnet=False):
+def ParseTxOutput(p, isTestnet=False, withAddresses=True):
     vout = {}
-    vout["value"] = p.readInt(8, "little")
+    vout["value"] = p.readUInt64()
     script_len = p.readVarInt()
     vout["scriptPubKey"] = {}
-    vout["scriptPubKey"]["hex"] = p.readString(script_len, "big")
+    locking_script = bytes(p.read(script_len))
+    vout["scriptPubKey"]["hex"] = locking_script.hex()
     vout["scriptPubKey"]["addresses"] = []
     try:
-        locking_script = bytes.fromhex(vout["scriptPubKey"]["hex"])
-
         # add addresses only if P2PKH, P2PK or P2CS
-        if len(locking_script) in [25, 35, 51]:
+        if withAddresses and len(locking_script) in [25, 35, 51]:
             add_bytes = utils.extract_pkh_from_locking_script(locking_script)
 
             address = pubkeyhash_to_address(add_bytes, isTestnet)
@@ -85,11 +106,13 @@ def ParseTxOutput(p, isTestnet=False):
     return vout
 
 
-def ParseTx(hex_string, isTestnet=False):
-    p = HexParser(hex_string)
+def ParseTx(rawtx, isTestnet=False, withAddresses=True):
+    # rawtx: bytes or hex string
+    # withAddresses: derive the addresses of the outputs (double-SHA256 and base58 for each output)
+    p = TxParser(rawtx)
     tx = {}
 
-    tx["version"] = p.readInt(4, "little")
+    tx["version"] = p.readUInt32()
 
     num_of_inputs = p.readVarInt()
     tx["vin"] = []
@@ -99,9 +122,9 @@ def ParseTx(hex_string, isTestnet=False):
     num_of_outputs = p.readVarInt()
     tx["vout"] = []
     for i in range(num_of_outputs):
-        tx["vout"].append(ParseTxOutput(p, isTestnet))
+        tx["vout"].append(ParseTxOutput(p, isTestnet, withAddresses))
 
-    tx["locktime"] = p.readInt(4, "little")
+    tx["locktime"] = p.readUInt32()
     return tx
 
 
@@ -109,16 +132,25 @@ def IsCoinStake(tx):
     return tx['vout'][0]["scriptPubKey"]["hex"] == ""
 
 
+def ClassifyOutput(rawtx, out_n, isTestnet=False):
+    """
+    Parses rawtx once (without deriving the addresses of the outputs).
+    Returns (coinstake, p2cs, staker) for the output out_n:
+    coinstake tx flag, pay-to-cold-staking flag and staker address ("" if not P2CS)
+    """
+    tx = ParseTx(rawtx, isTestnet, withAddresses=False)
+    script = bytes.fromhex(tx['vout'][out_n]["scriptPubKey"]["hex"])
+    staker = ""
+    p2cs = utils.IsPayToColdStaking(script)
+    if p2cs:
+        staker = pubkeyhash_to_address(utils.GetDelegatedStaker(script), isTestnet, isCold=True)
+    return IsCoinStake(tx), p2cs, staker
+
+
 def IsPayToColdStaking(rawtx, out_n):
-    tx = ParseTx(rawtx)
-    script = tx['vout'][out_n]["scriptPubKey"]["hex"]
-    return utils.IsPayToColdStaking(bytes.fromhex(script)), IsCoinStake(tx)
+    coinstake, p2cs, _ = ClassifyOutput(rawtx, out_n)
+    return p2cs, coinstake
 
 
 def GetDelegatedStaker(rawtx, out_n, isTestnet):
-    tx = ParseTx(rawtx)
-    script = tx['vout'][out_n]["scriptPubKey"]["hex"]
-    if not utils.IsPayToColdStaking(bytes.fromhex(script)):
-        return ""
-    pkh = utils.GetDelegatedStaker(bytes.fromhex(script))
-    return pubkeyhash_to_address(pkh, isTestnet, isCold=True)
+    return ClassifyOutput(rawtx, out_n, isTestnet)[2]
@@ -9,7 +9,7 @@ from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QAbstractItemVie
     QTableWidgetItem, QPushButton, QLabel, QGroupBox, QHBoxLayout, QFormLayout
 
 from misc import printException, sec_to_time, getCallerName, getFunctionName
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_NETWORK, PRIORITY_GUI
 
 
 class BudgetProjection_dlg(QDialog):
@@ -20,7 +20,8 @@ class BudgetProjection_dlg(QDialog):
         self.initUI()
         self.ui.ok_btn.clicked.connect(lambda: self.accept())
         self.next_superBlock = 0
-        ThreadFuns.runInThread(self.loadBudgetProjection_thread, (), self.displayBudgetProjection)
+        ThreadFuns.runInThread(self.loadBudgetProjection_thread, (), self.displayBudgetProjection,
+                               queue=QUEUE_NETWORK, priority=PRIORITY_GUI)
 
     def initUI(self):
         self.ui = Ui_BudgetProjectionDlg()
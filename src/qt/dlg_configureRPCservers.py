@@ -9,7 +9,7 @@ from PyQt5.QtWidgets import QDialog, QHBoxLayout, QVBoxLayout, QLabel, \
     QWidget, QPushButton, QMessageBox
 
 from misc import myPopUp, checkRPCstring
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_NETWORK, PRIORITY_GUI
 
 
 class ConfigureRPCservers_dlg(QDialog):
@@ -149,7 +149,8 @@ class ConfigureRPCservers_dlg(QDialog):
                 clients = self.main_wnd.mainWindow.header.rpcClientsBox
                 data = clients.itemData(clients.currentIndex())
                 if data.get('id') == id and data.get('isCustom'):
-                    ThreadFuns.runInThread(self.main_wnd.mainWindow.updateRPCstatus, (True,), )
+                    ThreadFuns.runInThread(self.main_wnd.mainWindow.updateRPCstatus, (True,),
+                                           queue=QUEUE_NETWORK, priority=PRIORITY_GUI)
 
             # call onCancel
             self.onCancel()
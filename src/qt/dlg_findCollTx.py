@@ -9,7 +9,7 @@ from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QLineEdit, QHBoxLayout, Q
     QSizePolicy, QTableWidget, QAbstractScrollArea, QAbstractItemView, QTableWidgetItem, QHeaderView, QSpacerItem
 
 from misc import printDbg, getCallerName, getFunctionName, printError
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_NETWORK, PRIORITY_GUI
 
 
 class FindCollTx_dlg(QDialog):
@@ -33,7 +33,8 @@ class FindCollTx_dlg(QDialog):
         # --- PIVX Address
         self.edtAddress.setText(self.pivx_addr)
         # --- Load utxos
-        ThreadFuns.runInThread(self.load_utxos_thread, (), self.display_utxos)
+        ThreadFuns.runInThread(self.load_utxos_thread, (), self.display_utxos,
+                               queue=QUEUE_NETWORK, priority=PRIORITY_GUI)
 
     def display_utxos(self):
         def item(value):
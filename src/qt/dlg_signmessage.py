@@ -28,7 +28,7 @@ from PyQt5.QtWidgets import (
 
 from misc import myPopUp, myPopUp_sb, getCallerName, getFunctionName, printException
 from pivx_hashlib import pubkey_to_address
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_HWDEVICE
 from utils import checkPivxAddr, ecdsa_verify_addr
 
 
@@ -140,7 +140,8 @@ class TabSign:
             if ans == QMessageBox.Yes:
                 # Look for 10 more addresses
                 starting_spath += spath_count
-                ThreadFuns.runInThread(self.findSpath, (starting_spath, spath_count), self.findSpath_done)
+                ThreadFuns.runInThread(self.findSpath, (starting_spath, spath_count), self.findSpath_done,
+                                       queue=QUEUE_HWDEVICE)
 
     def onChangeSelectedAddress(self):
         self.currName = None
@@ -223,7 +224,7 @@ class TabSign:
         # Go!
         if fromAddress:
             self.spath_found = False
-            ThreadFuns.runInThread(self.findSpath, (0, 10), self.findSpath_done)
+            ThreadFuns.runInThread(self.findSpath, (0, 10), self.findSpath_done, queue=QUEUE_HWDEVICE)
         else:
             self.spath_found = True
             self.spath = self.ui.spathSpinBox.value()
@@ -11,7 +11,6 @@ from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTab
 
 from constants import MINIMUM_FEE
 from misc import myPopUp
-from threads import ThreadFuns
 
 
 class SweepAll_dlg(QDialog):
@@ -41,7 +40,7 @@ class SweepAll_dlg(QDialog):
             self.display_utxos()
         else:
             # Reload UTXOs
-            ThreadFuns.runInThread(self.main_tab.caller.t_rewards.load_utxos_thread, ())
+            self.main_tab.caller.jobs.submit("rewards", self.main_tab.caller.t_rewards.load_utxos_thread)
 
     def showDialog(self):
         self.load_data()
@@ -85,6 +84,10 @@ class SweepAll_dlg(QDialog):
             item.setFlags(Qt.NoItemFlags)
             return item
 
+        # saved rewards not updated yet (possibly spent): nothing to send
+        if self.main_tab.caller.t_rewards.rewardsStale:
+            self.ui.buttonSend.setEnabled(False)
+
         if len(self.rewardsArray) == 0:
             self.ui.lblMessage.setText("Unable to get raw TX from RPC server\nPlease wait for full synchronization and try again.")
 
@@ -4,109 +4,205 @@
 # Distributed under the MIT software license, see the accompanying
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
-from bitcoinrpc.authproxy import AuthServiceProxy
+from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
 
+import base64
+import decimal
 import http.client as httplib
+import simplejson as json
 import ssl
 import threading
+import time
 
 from constants import DEFAULT_PROTOCOL_VERSION, MINIMUM_FEE
 from misc import getCallerName, getFunctionName, printException, printDbg, now, timeThis
 from proposals import Proposal
 
 
+def rankMasternodes(masternodes, current_time=None):
+    """
+    Sets the 'score' and the position in the payment queue ('queue_pos') of each masternode
+    of a listmasternodes payload (decreasing score, ties kept in list order).
+    """
+    if current_time is None:
+        current_time = now()
+
+    for mn in masternodes:
+        if mn.get('status') == 'ENABLED':
+            # compute masternode score
+            if mn.get('lastpaid') == 0:
+                mn['score'] = mn.get('activetime')
+            else:
+                lastpaid_ago = current_time - mn.get('lastpaid')
+                mn['score'] = min(lastpaid_ago, mn.get('activetime'))
+
+        else:
+            mn['score'] = 0
+
+    # save masternode position in the payment queue (sorted by decreasing score)
+    for pos, mn in enumerate(sorted(masternodes, key=lambda x: x['score'], reverse=True)):
+        mn['queue_pos'] = pos
+
+    return masternodes
+
+
+# calls changing the state of the server: never sent twice
+NON_IDEMPOTENT_CALLS = ('mnBudgetRawVote', 'relaymasternodebroadcast', 'sendRawTransaction')
+
+
 def process_RPC_exceptions(func):
     def wrapper(*args, **kwargs):
         try:
-            args[0].httpConnection.connect()
-            return func(*args, **kwargs)
+            if func.__name__ in NON_IDEMPOTENT_CALLS:
+                # a dropped connection can't tell if the request was received:
+                # send it on a fresh connection instead of retrying
+                args[0].httpConnection.close()
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            except (httplib.HTTPException, ConnectionError) as e:
+                # the kept-alive connection was dropped by the server: reconnect and retry once
+                printDbg(f"RPC: reconnecting ({e.__class__.__name__})")
+                args[0].httpConnection.close()
+                return func(*args, **kwargs)
         except Exception as e:
             message = "Exception in RPC client"
             printException(getCallerName(True), getFunctionName(True), message, str(e))
+            # reset the connection (a new one is opened with the next request)
+            args[0].httpConnection.close()
             # Return a default value based on the expected return structure of the wrapped function
             if func.__name__ == 'getStatus':
                 return False, "Error: RPC call failed", 0, None, False
             elif func.__name__ == 'isBlockchainSynced':
                 return False, None
+            elif func.__name__ == 'getStatusAndSync':
+                return False, "Error: RPC call failed", 0, None, False, False
             # Handle other functions or provide a general default return
             else:
                 return None
-        finally:
-            try:
-                args[0].httpConnection.close()
-            except Exception as e:
-                printDbg(e)
-                pass
     return wrapper
 
 
 class RpcClient:
 
     def __init__(self, rpc_protocol, rpc_host, rpc_user, rpc_password):
-        # Lock for threads
-        self.lock = threading.RLock()
+        # Keep-alive connections (one for each thread, reopened when needed)
+        self.local = threading.local()
 
+        self.rpc_params = (rpc_protocol, rpc_host, rpc_user, rpc_password)
         self.rpc_url = f"{rpc_protocol}://{rpc_user}:{rpc_password}@{rpc_host}"
+        self.auth_header = b'Basic ' + base64.b64encode(f"{rpc_user}:{rpc_password}".encode('utf8'))
+
+    @property
+    def httpConnection(self):
+        if getattr(self.local, 'httpConnection', None) is None:
+            rpc_protocol, rpc_host = self.rpc_params[:2]
+            host, port = rpc_host.split(":")
+            if rpc_protocol == "https":
+                self.local.httpConnection = httplib.HTTPSConnection(host, port, timeout=20, context=ssl.create_default_context())
+            else:
+                self.local.httpConnection = httplib.HTTPConnection(host, port, timeout=20)
+            self.local.conn = AuthServiceProxy(self.rpc_url, timeout=1000, connection=self.local.httpConnection)
+
+        return self.local.httpConnection
+
+    @property
+    def conn(self):
+        # AuthServiceProxy using the connection of the current thread
+        self.httpConnection
+        return self.local.conn
+
+    def _batch(self, calls):
+        """
+        Sends the list of calls [method, *params] as a single JSON-RPC 2.0 batch request.
+        Returns the list of results, in the same order of the calls (None for the failed ones).
+        Call it from methods wrapped in process_RPC_exceptions.
+        """
+        if len(calls) == 0:
+            return []
+        postdata = json.dumps([{'jsonrpc': '2.0', 'method': c[0], 'params': list(c[1:]), 'id': i}
+                               for i, c in enumerate(calls)])
+        self.httpConnection.request('POST', '/', postdata,
+                                    {'Host': self.httpConnection.host,
+                                     'Authorization': self.auth_header,
+                                     'Content-type': 'application/json'})
+        http_response = self.httpConnection.getresponse()
+        responsedata = http_response.read().decode('utf8')
+        if http_response.getheader('Content-Type') != 'application/json':
+            raise JSONRPCException({
+                'code': -342, 'message': f"non-JSON HTTP response with '{http_response.status} {http_response.reason}' from server"})
+        responses = json.loads(responsedata, parse_float=decimal.Decimal)
+        if not isinstance(responses, list):
+            # the whole batch was rejected
+            raise JSONRPCException(responses.get('error') or {'code': -343, 'message': 'invalid JSON-RPC batch response'})
+
+        # responses can be returned in any order
+        results = [None] * len(calls)
+        for r in responses:
+            if r.get('error') is not None:
+                printDbg(f"RPC: batch call {calls[r['id']][0]} failed: {r['error']}")
+            else:
+                results[r['id']] = r.get('result')
 
-        host, port = rpc_host.split(":")
-        if rpc_protocol == "https":
-            self.httpConnection = httplib.HTTPSConnection(host, port, timeout=20, context=ssl.create_default_context())
-        else:
-            self.httpConnection = httplib.HTTPConnection(host, port, timeout=20)
+        return results
 
-        self.conn = AuthServiceProxy(self.rpc_url, timeout=1000, connection=self.httpConnection)
+    @process_RPC_exceptions
+    def batch(self, calls):
+        return self._batch(calls)
 
     @process_RPC_exceptions
     def getBlockCount(self):
         n = 0
-        with self.lock:
-            n = self.conn.getblockcount()
+        n = self.conn.getblockcount()
 
         return n
 
     @process_RPC_exceptions
     def getBlockHash(self, blockNum):
         h = None
-        with self.lock:
-            h = self.conn.getblockhash(blockNum)
+        h = self.conn.getblockhash(blockNum)
 
         return h
 
     @process_RPC_exceptions
     def getBudgetVotes(self, proposal):
         votes = {}
-        with self.lock:
-            votes = self.conn.getbudgetvotes(proposal)
+        votes = self.conn.getbudgetvotes(proposal)
+
+        return votes
+
+    @process_RPC_exceptions
+    def getBudgetVotesList(self, proposals):
+        # budget votes for each proposal name (None if unavailable), in a single request
+        votes = []
+        votes = self._batch([['getbudgetvotes', p] for p in proposals])
 
         return votes
 
     @process_RPC_exceptions
     def getFeePerKb(self):
         res = MINIMUM_FEE
-        with self.lock:
-            # get transaction data from last 200 blocks
-            feePerKb = float(self.conn.getfeeinfo(200)['feeperkb'])
-            res = (feePerKb if feePerKb > MINIMUM_FEE else MINIMUM_FEE)
+        # get transaction data from last 200 blocks
+        feePerKb = float(self.conn.getfeeinfo(200)['feeperkb'])
+        res = (feePerKb if feePerKb > MINIMUM_FEE else MINIMUM_FEE)
 
         return res
 
     @process_RPC_exceptions
     def getMNStatus(self, address):
         mnStatus = None
-        with self.lock:
-            mnStatusList = self.conn.listmasternodes(address)
-            if not mnStatusList:
-                return None
-            mnStatus = mnStatusList[0]
-            mnStatus['mnCount'] = self.conn.getmasternodecount()['enabled']
+        mnStatusList, mnCount = self._batch([['listmasternodes', address], ['getmasternodecount']])
+        if not mnStatusList or mnCount is None:
+            return None
+        mnStatus = mnStatusList[0]
+        mnStatus['mnCount'] = mnCount['enabled']
 
         return mnStatus
 
     @process_RPC_exceptions
     def getMasternodeCount(self):
         ans = None
-        with self.lock:
-            ans = self.conn.getmasternodecount()
+        ans = self.conn.getmasternodecount()
 
         return ans
 
@@ -114,31 +210,10 @@ class RpcClient:
     def getMasternodes(self):
         printDbg("RPC: Getting masternode list...")
         mnList = {}
-        score = []
         masternodes = []
-        with self.lock:
-            masternodes = self.conn.listmasternodes()
-
-        for mn in masternodes:
-            if mn.get('status') == 'ENABLED':
-                # compute masternode score
-                if mn.get('lastpaid') == 0:
-                    mn['score'] = mn.get('activetime')
-                else:
-                    lastpaid_ago = now() - mn.get('lastpaid')
-                    mn['score'] = min(lastpaid_ago, mn.get('activetime'))
-
-            else:
-                mn['score'] = 0
-
-            score.append(mn)
+        masternodes = self.conn.listmasternodes()
 
-        # sort masternodes by decreasing score
-        score.sort(key=lambda x: x['score'], reverse=True)
-
-        # save masternode position in the payment queue
-        for mn in masternodes:
-            mn['queue_pos'] = score.index(mn)
+        rankMasternodes(masternodes)
 
         mnList['masternodes'] = masternodes
 
@@ -147,8 +222,7 @@ class RpcClient:
     @process_RPC_exceptions
     def getNextSuperBlock(self):
         n = 0
-        with self.lock:
-            n = self.conn.getnextsuperblock()
+        n = self.conn.getnextsuperblock()
 
         return n
 
@@ -157,9 +231,8 @@ class RpcClient:
         printDbg("RPC: Getting proposals list...")
         proposals = []
         data = []
-        with self.lock:
-            # get proposals JSON data
-            data = self.conn.getbudgetinfo()
+        # get proposals JSON data
+        data = self.conn.getbudgetinfo()
 
         for p in data:
             # create proposal Object
@@ -178,9 +251,8 @@ class RpcClient:
         printDbg("RPC: Getting proposals projection...")
         data = []
         proposals = []
-        with self.lock:
-            # get budget projection JSON data
-            data = self.conn.getbudgetprojection()
+        # get budget projection JSON data
+        data = self.conn.getbudgetprojection()
 
         for p in data:
             # create proposal-projection dictionary
@@ -198,17 +270,23 @@ class RpcClient:
     @process_RPC_exceptions
     def getProtocolVersion(self):
         res = DEFAULT_PROTOCOL_VERSION
-        with self.lock:
-            prot_version = self.conn.getinfo().get('protocolversion')
-            res = int(prot_version)
+        prot_version = self.conn.getinfo().get('protocolversion')
+        res = int(prot_version)
 
         return res
 
     @process_RPC_exceptions
     def getRawTransaction(self, txid):
         res = None
-        with self.lock:
-            res = self.conn.getrawtransaction(txid)
+        res = self.conn.getrawtransaction(txid)
+
+        return res
+
+    @process_RPC_exceptions
+    def getRawTransactions(self, txids):
+        # raw txes for each txid (None if unavailable), in a single request
+        res = []
+        res = self._batch([['getrawtransaction', txid] for txid in txids])
 
         return res
 
@@ -219,11 +297,10 @@ class RpcClient:
         statusMess += "Either the local PIVX wallet is not open, or the remote RPC server is not responding."
         n = 0
         response_time = None
-        with self.lock:
-            isTestnet = self.conn.getinfo()['testnet']
-            n, response_time = timeThis(self.conn.getblockcount)
-            if n is None:
-                n = 0
+        isTestnet = self.conn.getinfo()['testnet']
+        n, response_time = timeThis(self.conn.getblockcount)
+        if n is None:
+            n = 0
 
         if n > 0:
             status = True
@@ -231,22 +308,44 @@ class RpcClient:
 
         return status, statusMess, n, response_time, isTestnet
 
+    @process_RPC_exceptions
+    def getStatusAndSync(self):
+        # getStatus and isBlockchainSynced in a single request
+        status = False
+        statusMess = "Unable to connect to a PIVX RPC server.\n"
+        statusMess += "Either the local PIVX wallet is not open, or the remote RPC server is not responding."
+        isSynced = False
+        start = time.time()
+        info, n, sync = self._batch([['getinfo'], ['getblockcount'], ['mnsync', 'status']])
+        response_time = time.time() - start
+        if info is None:
+            raise Exception(statusMess)
+        isTestnet = info['testnet']
+        if n is None:
+            n = 0
+        if sync is not None:
+            isSynced = sync.get("IsBlockchainSynced")
+
+        if n > 0:
+            status = True
+            statusMess = "Connected to PIVX Blockchain"
+
+        return status, statusMess, n, response_time, isTestnet, isSynced
+
     @process_RPC_exceptions
     def isBlockchainSynced(self):
         res = False
         response_time = None
-        with self.lock:
-            status, response_time = timeThis(self.conn.mnsync, 'status')
-            if status is not None:
-                res = status.get("IsBlockchainSynced")
+        status, response_time = timeThis(self.conn.mnsync, 'status')
+        if status is not None:
+            res = status.get("IsBlockchainSynced")
 
         return res, response_time
 
     @process_RPC_exceptions
     def mnBudgetRawVote(self, mn_tx_hash, mn_tx_index, proposal_hash, vote, time, vote_sig):
         res = None
-        with self.lock:
-            res = self.conn.mnbudgetrawvote(mn_tx_hash, mn_tx_index, proposal_hash, vote, time, vote_sig)
+        res = self.conn.mnbudgetrawvote(mn_tx_hash, mn_tx_index, proposal_hash, vote, time, vote_sig)
 
         return res
 
@@ -254,8 +353,7 @@ class RpcClient:
     def decodemasternodebroadcast(self, work):
         printDbg("RPC: Decoding masternode broadcast...")
         res = ""
-        with self.lock:
-            res = self.conn.decodemasternodebroadcast(work.strip())
+        res = self.conn.decodemasternodebroadcast(work.strip())
 
         return res
 
@@ -263,8 +361,7 @@ class RpcClient:
     def relaymasternodebroadcast(self, work):
         printDbg("RPC: Relaying masternode broadcast...")
         res = ""
-        with self.lock:
-            res = self.conn.relaymasternodebroadcast(work.strip())
+        res = self.conn.relaymasternodebroadcast(work.strip())
 
         return res
 
@@ -274,8 +371,7 @@ class RpcClient:
         dbg_mess += "..."
         printDbg(dbg_mess)
         tx_id = None
-        with self.lock:
-            tx_id = self.conn.sendrawtransaction(tx_hex, True)
+        tx_id = self.conn.sendrawtransaction(tx_hex, True)
 
         return tx_id
 
@@ -283,7 +379,6 @@ class RpcClient:
     def verifyMessage(self, pivxaddress, signature, message):
         printDbg("RPC: Verifying message...")
         res = False
-        with self.lock:
-            res = self.conn.verifymessage(pivxaddress, signature, message)
+        res = self.conn.verifymessage(pivxaddress, signature, message)
 
         return res
@@ -17,7 +17,7 @@ from database import Database
 from misc import getSPMTVersion, printDbg, initLogs, \
     clean_v4_migration, saveCacheSettings, readCacheSettings
 from mainWindow import MainWindow
-from constants import user_dir, SECONDS_IN_2_MONTHS
+from constants import user_dir, JOBS_CHECKPOINT_TTL
 from qt.dlg_configureRPCservers import ConfigureRPCservers_dlg
 from qt.dlg_signmessage import SignMessage_dlg
 
@@ -74,14 +74,13 @@ class App(QMainWindow):
         if start_args.clearTxCache:
             self.db.clearTable('RAWTXES')
 
-        # Clear Rewards and Governance DB (in case of forced shutdown)
-        self.db.clearTable('REWARDS')
+        # Clear Governance DB (in case of forced shutdown)
+        # Rewards are kept and synced incrementally by TabRewards.load_utxos_thread
         self.db.clearTable('PROPOSALS')
         self.db.clearTable('MY_VOTES')
 
-        # Remove raw txes updated earlier than two months ago (if not already cleared)
-        if not start_args.clearTxCache:
-            self.db.clearRawTxes(time() - SECONDS_IN_2_MONTHS)
+        # Discard the checkpoints of jobs interrupted long ago
+        self.db.clearCheckpoints(int(time()) - JOBS_CHECKPOINT_TTL)
 
         # Read Masternode List
         masternode_list = self.db.getMasternodeList()
@@ -154,6 +153,8 @@ class App(QMainWindow):
         # Terminate the running threads.
         # Set the shutdown flag on each thread to trigger a clean shutdown of each thread.
         self.mainWindow.myRpcWd.shutdown_flag.set()
+        self.mainWindow.myDbWd.shutdown_flag.set()
+        self.mainWindow.jobs.cancelAll()
         logging.debug("Saving stuff & closing...")
         try:
             self.mainWindow.hwdevice.clearDevice()
@@ -178,14 +179,13 @@ class App(QMainWindow):
         # persist cache
         saveCacheSettings(self.cache)
 
-        # Clear Rewards and Governance DB
+        # Clear Governance DB
         try:
             self.db.openDB()
         except Exception:
             pass
-        self.db.removeTable('REWARDS')
-        self.db.removeTable('PROPOSALS')
-        self.db.removeTable('MY_VOTES')
+        self.db.clearTable('PROPOSALS')
+        self.db.clearTable('MY_VOTES')
 
         # close database
         self.db.close()
@@ -5,9 +5,12 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 import bitcoin
+import hashlib
 import random
 import time
 
+import simplejson as json
+
 from PyQt5.Qt import QDesktopServices, QUrl
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QTableWidgetItem, QPushButton, QWidget, QHBoxLayout
@@ -19,7 +22,6 @@ from qt.gui_tabGovernance import TabGovernance_gui, ScrollMessageBox
 from qt.dlg_proposalDetails import ProposalDetails_dlg
 from qt.dlg_selectMNs import SelectMNs_dlg
 from qt.dlg_budgetProjection import BudgetProjection_dlg
-from threads import ThreadFuns
 from utils import ecdsa_sign, ecdsa_sign_bin
 
 
@@ -182,8 +184,11 @@ class TabGovernance():
         self.proposalsLoaded = False
 
         proposals = self.caller.rpcClient.getProposals()
-        for p in proposals:
-            self.caller.parent.db.addProposal(p)
+        ctrl.setProgress(50)
+        if ctrl.finish:
+            return
+        if proposals is not None:
+            self.caller.parent.db.addProposals(proposals)
         num_of_masternodes = self.caller.rpcClient.getMasternodeCount()
 
         if num_of_masternodes is None:
@@ -214,7 +219,7 @@ class TabGovernance():
 
     def onRefreshProposals(self):
         self.ui.resetStatusLabel()
-        ThreadFuns.runInThread(self.loadProposals_thread, (), )
+        self.caller.jobs.submit("proposals", self.loadProposals_thread)
 
     def onToggleExpiring(self):
         if self.ui.toggleExpiring_btn.text() == "Hide Expiring":
@@ -248,7 +253,7 @@ class TabGovernance():
         reply = self.summaryDlg(vote_code)
 
         if reply == 1:
-            ThreadFuns.runInThread(self.vote_thread, ([vote_code]), self.vote_thread_end)
+            self.caller.jobs.submit(self.voteJobKey(vote_code), self.vote_thread, ([vote_code]), self.vote_thread_end)
 
     def summaryDlg(self, vote_code):
         message = f"Voting <b>{self.vote_codes[vote_code].upper()}</b> on the following proposal(s):<br><br>"
@@ -265,9 +270,13 @@ class TabGovernance():
 
     def updateMyVotes(self):
         proposals = self.caller.parent.db.getProposalsList()
-        for prop in proposals:
-            mnList = self.caller.masternode_list
-            budgetVotes = self.caller.rpcClient.getBudgetVotes(prop.name)
+        mnList = self.caller.masternode_list
+        budgetVotesList = self.caller.rpcClient.getBudgetVotesList([prop.name for prop in proposals])
+        if budgetVotesList is None:
+            return
+        for prop, budgetVotes in zip(proposals, budgetVotesList):
+            if budgetVotes is None:
+                continue
 
             myVotes = [[mn['name'], vote] for vote in budgetVotes
                        for mn in mnList if mn['collateral'].get('txid') == vote['mnId']]
@@ -306,12 +315,24 @@ class TabGovernance():
             serialize_for_sig += f'{hash} {vote_code} {sig_time}'
             return serialize_for_sig
 
+    def voteJobKey(self, vote_code):
+        # same vote on the same proposals with the same masternodes: same job
+        selection = [sorted(prop.Hash for prop in self.selectedProposals), sorted(mn[1] for mn in self.votingMasternodes)]
+        return f"vote_{vote_code}_{hashlib.sha256(json.dumps(selection).encode()).hexdigest()[:16]}"
+
     def vote_thread(self, ctrl, vote_code):
         # vote_code index for ["yes", "abstain", "no"]
         if not isinstance(vote_code, int) or vote_code not in range(3):
             raise Exception(f"Wrong vote_code {vote_code}")
-        self.successVotes = 0
+        # votes already sent by an interrupted run (proposal hash, masternode name)
+        votesDone = set(tuple(v) for v in ctrl.checkpoint.get('done', []))
+        # checkpoints of interrupted runs with a different vote (dropped when the vote is replaced)
+        otherVotes = {key: set(tuple(v) for v in checkpoint.get('done', []))
+                      for key, checkpoint in self.caller.parent.db.getCheckpoints("vote_").items()
+                      if not key.startswith(f"vote_{vote_code}_")}
+        self.successVotes = len(votesDone)
         self.failedVotes = 0
+        totalVotes = len(self.selectedProposals) * len(self.votingMasternodes)
         self.currHeight = self.caller.rpcClient.getBlockCount()
 
         # save delay check data to cache and persist settings
@@ -321,6 +342,11 @@ class TabGovernance():
 
         for prop in self.selectedProposals:
             for mn in self.votingMasternodes:
+                if ctrl.finish:
+                    printDbg(f"Voting interrupted ({self.successVotes} / {totalVotes} votes sent)")
+                    return
+                if (prop.Hash, mn[1]) in votesDone:
+                    continue
                 vote_sig = ''
                 serialize_for_sig = ''
                 sig_time = int(time.time())
@@ -374,8 +400,16 @@ class TabGovernance():
 
                     if v_res == 'Voted successfully':
                         self.successVotes += 1
+                        # checkpoint (failed votes are sent again by a resumed run)
+                        votesDone.add((prop.Hash, mn[1]))
+                        ctrl.checkpoint['done'] = list(votesDone)
+                        ctrl.saveCheckpoint()
+                        for key in [k for k, done in otherVotes.items() if (prop.Hash, mn[1]) in done]:
+                            self.caller.parent.db.deleteCheckpoint(key)
+                            del otherVotes[key]
                     else:
                         self.failedVotes += 1
+                    ctrl.setProgress(int(100 * (self.successVotes + self.failedVotes) / totalVotes))
 
                 except Exception as e:
                     err_msg = "Exception in vote_thread - check MN privKey"
@@ -12,7 +12,7 @@ from misc import printDbg, printOK, is_hex, appendMasternode, myPopUp, myPopUp_s
 from pivx_hashlib import generate_privkey
 from qt.gui_tabMNConf import TabMNConf_gui
 from qt.dlg_findCollTx import FindCollTx_dlg
-from threads import ThreadFuns
+from threads import QUEUE_HWDEVICE
 
 
 class TabMNConf:
@@ -20,7 +20,6 @@ class TabMNConf:
         self.caller = caller
         self.ui = TabMNConf_gui(masternode_alias)
         self.caller.tabMNConf = self.ui
-        self.runInThread = ThreadFuns.runInThread
         self.spath_found = False
         self.spath = -1
         # Lookup Collateral dialog
@@ -44,7 +43,7 @@ class TabMNConf:
             myPopUp_sb(self.caller, "crit", 'SPMT - hw device check', "Connect to HW device first")
             printDbg(f"Unable to connect to hardware device. The device status is: {self.caller.hwStatus}")
             return None
-        self.runInThread(self.findSpath, (0, 10), self.findSpath_done)
+        self.caller.jobs.submit("findSpath", self.findSpath, (0, 10), self.findSpath_done, queue=QUEUE_HWDEVICE)
 
     def findSpath(self, ctrl, starting_spath, spath_count):
         currAddr = self.ui.edt_address.text().strip()
@@ -76,7 +75,8 @@ class TabMNConf:
             ans = myPopUp(self.caller, "crit", 'SPMT - spath search', f"{mess}")
             if ans == QMessageBox.Yes:
                 starting_spath += spath_count
-                self.runInThread(self.findSpath, (starting_spath, spath_count), self.findSpath_done)
+                self.caller.jobs.submit("findSpath", self.findSpath, (starting_spath, spath_count), self.findSpath_done,
+                                        queue=QUEUE_HWDEVICE)
 
     def findPubKey(self):
         printDbg("Computing public key...")
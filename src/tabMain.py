@@ -5,25 +5,28 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 import logging
-import simplejson as json
+from concurrent.futures import wait
 import time
+import simplejson as json
 
 from PyQt5.Qt import QApplication
 from PyQt5.QtWidgets import QMessageBox
 
+from constants import BALANCES_TIMEOUT, BALANCES_POLL_INTERVAL
 from masternode import Masternode
 from misc import printDbg, printException, printOK, getCallerName, getFunctionName, \
     removeMNfromList, myPopUp, myPopUp_sb
 from qt.gui_tabMain import TabMain_gui
 from qt.dlg_mnStatus import MnStatus_dlg
 from qt.dlg_sweepAll import SweepAll_dlg
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_EXPLORER
 
 
 class TabMain:
     def __init__(self, caller):
         self.caller = caller
         self.all_masternodes = {}
+        self.masternodes_index = {}
         self.mnToStartList = []
         self.ui = TabMain_gui(caller)
         self.caller.tabMain = self.ui
@@ -41,22 +44,20 @@ class TabMain:
             self.ui.btn_rewards[name].clicked.connect(lambda: self.onRewardsMN())
 
     def displayMNlistUpdated(self):
-        for masternode in self.caller.masternode_list:
-            printDbg(f"Checking {masternode['name']} ({masternode['collateral'].get('txid')})...")
-            self.displayMNStatus(masternode)
-            time.sleep(0.1)
+        # repaint once, after all the rows are updated
+        self.ui.setUpdatesEnabled(False)
+        try:
+            for masternode in self.caller.masternode_list:
+                printDbg(f"Checking {masternode['name']} ({masternode['collateral'].get('txid')})...")
+                self.displayMNStatus(masternode)
+        finally:
+            self.ui.setUpdatesEnabled(True)
+        QApplication.processEvents()
 
     def displayMNStatus(self, currMN):
-        statusData = None
-        for mn in self.all_masternodes.get('masternodes'):
-            # find the balance of currMN and display it
-            if mn.get('txhash') == currMN['collateral'].get('txid') and mn.get('outidx') == currMN['collateral'].get('txidn'):
-                statusData = mn
-                try:
-                    statusData['balance'] = self.caller.apiClient.getBalance(mn.get('addr'))
-                except Exception as e:
-                    err_msg = f"error getting balance of {mn.get('addr')}"
-                    printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+        # find currMN in the network list and display its status and balance
+        # (balance fetched by updateAllMasternodes_thread)
+        statusData = self.masternodes_index.get((currMN['collateral'].get('txid'), currMN['collateral'].get('txidn')))
 
         masternode_alias = currMN['name']
         self.ui.btn_details[masternode_alias].disconnect()
@@ -72,8 +73,8 @@ class TabMain:
             self.ui.btn_details[masternode_alias].setEnabled(False)
         else:
             display_text = ""
-            if statusData['balance'] is not None:
-                self.ui.mnBalance[masternode_alias].setText(f'&nbsp;<span style="color:purple">{statusData["balance"]} PIV</span>')
+            if statusData.get('balance') is not None:
+                self.ui.mnBalance[masternode_alias].setText(f'&nbsp;<span style="color:purple">{round(int(statusData["balance"]) / 1e8, 8)} PIV</span>')
                 self.ui.mnBalance[masternode_alias].show()
             printOK(f"Got status {statusData['status']} for {masternode_alias}")
             if statusData['status'] == 'ENABLED':
@@ -93,7 +94,6 @@ class TabMain:
             self.ui.mnStatusLabel[masternode_alias].setText(display_text)
             self.ui.mnStatusLabel[masternode_alias].show()
             self.ui.btn_details[masternode_alias].setEnabled(True)
-        QApplication.processEvents()
 
     def onCheckAllMN(self):
         if not self.caller.rpcConnected:
@@ -107,7 +107,7 @@ class TabMain:
             return
         try:
             printDbg("Check-All pressed")
-            ThreadFuns.runInThread(self.updateAllMasternodes_thread, (), self.displayMNlistUpdated)
+            self.caller.jobs.submit("checkAllMN", self.updateAllMasternodes_thread, (), self.displayMNlistUpdated)
 
         except Exception as e:
             err_msg = "error in checkAllMN"
@@ -287,3 +287,42 @@ class TabMain:
 
     def updateAllMasternodes_thread(self, ctrl):
         self.all_masternodes = self.caller.rpcClient.getMasternodes()
+        if self.all_masternodes is None:
+            self.all_masternodes = {'masternodes': []}
+        # index the network list by collateral outpoint
+        self.masternodes_index = {(mn.get('txhash'), mn.get('outidx')): mn
+                                  for mn in self.all_masternodes.get('masternodes')}
+        ctrl.setProgress(50)
+        if ctrl.finish:
+            return
+
+        # get the balances of my masternodes (concurrent requests, at most BALANCES_TIMEOUT seconds)
+        blockCount = self.caller.rpcClient.getBlockCount()
+        if blockCount is not None:
+            self.caller.apiClient.setBlockHeight(blockCount)
+        my_mns = [self.masternodes_index[key] for key in
+                  ((m['collateral'].get('txid'), m['collateral'].get('txidn')) for m in self.caller.masternode_list)
+                  if key in self.masternodes_index]
+        if len(my_mns) == 0:
+            return
+        apiClient = self.caller.apiClient
+        futures = {ThreadFuns.callInThread(apiClient.getBalance, (mn.get('addr'),), QUEUE_EXPLORER): mn
+                   for mn in my_mns}
+        # wait in short slices, to stop as soon as the job is cancelled
+        deadline = time.monotonic() + BALANCES_TIMEOUT
+        not_done = set(futures)
+        while len(not_done) > 0 and not ctrl.finish and time.monotonic() < deadline:
+            _, not_done = wait(not_done, timeout=max(0, min(BALANCES_POLL_INTERVAL, deadline - time.monotonic())))
+        for future in not_done:
+            # not started yet: skipped
+            future.cancel()
+        for future in [f for f in futures if f not in not_done]:
+            try:
+                futures[future]['balance'] = future.result()
+            except Exception as e:
+                err_msg = f"error getting balance of {futures[future].get('addr')}"
+                printException(f"{getCallerName()}", f"{getFunctionName()}", f"{err_msg}", f"{e}")
+        if ctrl.finish:
+            return
+        for future in not_done:
+            printDbg(f"Timeout getting balance of {futures[future].get('addr')}")
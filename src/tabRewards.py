@@ -5,21 +5,23 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 import threading
+import time
 import simplejson as json
 
 from PyQt5.Qt import QApplication
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QColor, QFont
 from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QHeaderView
 
-from constants import MINIMUM_FEE
+from constants import MINIMUM_FEE, API_MAX_WORKERS, RPC_BATCH_SIZE, REWARDS_RETRY_DELAY, REWARDS_MAX_RETRY_DELAY
 from misc import printDbg, printError, printException, getCallerName, getFunctionName, \
     persistCacheSetting, myPopUp, myPopUp_sb, DisconnectedException, checkTxInputs
-from pivx_parser import ParseTx, IsPayToColdStaking, GetDelegatedStaker
+from pipeline import Pipeline
+from pivx_parser import ParseTx, ClassifyOutput
 from qt.gui_tabRewards import TabRewards_gui
-from threads import ThreadFuns
+from threads import PRIORITY_GUI, PRIORITY_BACKGROUND
 from txCache import TxCache
-from utils import checkPivxAddr
+from utils import checkPivxAddr, getAddressCacheStats
 
 
 class TabRewards:
@@ -27,13 +29,16 @@ class TabRewards:
     def __init__(self, caller):
         self.caller = caller
         # --- Lock for loading UTXO thread
-        self.runInThread = ThreadFuns.runInThread
         self.Lock = threading.Lock()
 
         # --- Initialize Selection
         self.selectedRewards = None
         self.feePerKb = MINIMUM_FEE
         self.suggestedFee = MINIMUM_FEE
+        # saved rewards (confirmations, spent outputs) are stale until the first update of the session
+        self.rewardsStale = True
+        self.staleReloads = 0  # automatic updates attempted (while stale)
+        self.lastStaleReload = None
 
         # --- Initialize GUI
         self.ui = TabRewards_gui(caller.imgDir)
@@ -75,12 +80,21 @@ class TabRewards:
         self.updateTotalBalance(rewards)
 
         if rewards is not None:
+            stale = self.rewardsStale
+
             def item(value):
                 item = QTableWidgetItem(value)
                 item.setTextAlignment(Qt.AlignCenter)
-                item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+                if stale:
+                    # possibly spent: not selectable until updated
+                    item.setFlags(Qt.ItemIsEnabled)
+                    item.setForeground(QColor("gray"))
+                    item.setToolTip("Saved in a previous session (not updated yet)")
+                else:
+                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
                 return item
 
+            self.ui.btn_sendRewards.setEnabled(not stale)
             # Clear up old list
             self.ui.rewardsList.box.setRowCount(0)
             # Make room for new list
@@ -121,7 +135,10 @@ class TabRewards:
                 self.ui.rewardsList.box.hideRow(self.ui.rewardsList.box.collateralRow)
 
             if len(rewards) > 1:  # (collateral is a reward)
-                self.ui.rewardsList.statusLabel.setVisible(False)
+                if stale:
+                    self.ui.resetStatusLabel('<em><b style="color:gray">Saved rewards - waiting for the update...</b></em>')
+                else:
+                    self.ui.rewardsList.statusLabel.setVisible(False)
                 self.ui.rewardsList.box.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
             else:
                 if not self.caller.rpcConnected:
@@ -173,9 +190,7 @@ class TabRewards:
 
     def load_utxos_thread(self, ctrl):
         with self.Lock:
-            # clear rewards DB
             printDbg("Updating rewards...")
-            self.caller.parent.db.clearTable('REWARDS')
             self.caller.parent.db.clearTable('MY_VOTES')
 
             # If rpc is not connected and hw device is Ledger, warn and return.
@@ -183,47 +198,98 @@ class TabRewards:
                 printError(f"{getCallerName()}", f"{getFunctionName()}", 'PIVX daemon not connected - Unable to update UTXO list')
                 return
 
-            total_num_of_utxos = 0
-            mn_rewards = {}
-            for mn in self.caller.masternode_list:
-                # Load UTXOs from API client
+            # Cached explorer answers are valid until the next block
+            blockCount = self.caller.rpcClient.getBlockCount() if self.caller.rpcClient is not None else None
+            if blockCount is not None:
+                self.caller.apiClient.setBlockHeight(blockCount)
+
+            masternodes = list(self.caller.masternode_list)
+            saved = {(r['txid'], r['vout']): r for r in self.caller.parent.db.getRewardsList()}
+            txCache = TxCache(self.caller)
+            isTestnet = self.caller.isTestnetRPC
+            lock = threading.Lock()
+            fetched = set()
+            updated = []
+            progress = {'masternodes': 0, 'new': 0, 'classified': 0}
+
+            def emitProgress(key):
+                # first half: explorer answers - second half: classified new utxos
+                with lock:
+                    progress[key] += 1
+                    percent = 50 * progress['masternodes'] / max(len(masternodes), 1)
+                    if progress['new'] > 0:
+                        percent += 50 * progress['classified'] / progress['new']
+                ctrl.setProgress(min(int(percent), 99))
+                self.caller.sig_UTXOsLoading.emit(ctrl.progress)
+
+            # Stages: fetch UTXOs -> dedupe / diff -> prefetch raw txes -> classify -> persist
+            def fetch(mn, emit):
                 rewards = self.caller.apiClient.getAddressUtxos(mn['collateral'].get('address'))
-
                 if rewards is None:
-                    printError(f"{getCallerName()}", f"{getFunctionName()}", 'API client not responding.')
-                    return
-
-                mn_rewards[mn['name']] = rewards
-                total_num_of_utxos += len(rewards)
-
-            printDbg(f"Number of UTXOs to load: {total_num_of_utxos}")
-            curr_utxo = 0
-
-            for mn in mn_rewards:
-                for utxo in mn_rewards[mn]:
+                    raise Exception('API client not responding.')
+                for utxo in rewards:
                     # Add mn_name to UTXO
-                    utxo['mn_name'] = mn
-                    # Get raw tx
-                    rawtx = TxCache(self.caller)[utxo['txid']]
+                    utxo['mn_name'] = mn['name']
+                    emit(utxo)
+                emitProgress('masternodes')
+
+            def dedupe(utxo, emit):
+                key = (utxo['txid'], utxo['vout'])
+                if key in fetched:
+                    return
+                fetched.add(key)
+                # only new UTXOs need to be classified
+                if key in saved and saved[key]['mn_name'] == utxo['mn_name']:
+                    if saved[key]['confirmations'] != utxo['confirmations']:
+                        updated.append(utxo)
+                    return
+                with lock:
+                    progress['new'] += 1
+                emit(utxo)
+
+            def prefetch(utxos, emit):
+                rawtxes = txCache.get_many(utxo['txid'] for utxo in utxos)
+                for utxo in utxos:
+                    rawtx = rawtxes.get(utxo['txid'])
                     if rawtx is None:
                         printDbg(f"Unable to get raw TX with hash={utxo['txid']} from RPC server.")
                         # Don't save UTXO if raw TX is unavailable
-                        mn_rewards[mn].remove(utxo)
+                        emitProgress('classified')
                         continue
                     utxo['raw_tx'] = rawtx
-                    utxo['staker'] = ""
-                    p2cs, utxo['coinstake'] = IsPayToColdStaking(rawtx, utxo['vout'])
-                    if p2cs:
-                        utxo['staker'] = GetDelegatedStaker(rawtx, utxo['vout'], self.caller.isTestnetRPC)
-                    # Add utxo to database
-                    self.caller.parent.db.addReward(utxo)
-
-                    # emit percent
-                    percent = int(100 * curr_utxo / total_num_of_utxos)
-                    self.caller.sig_UTXOsLoading.emit(percent)
-                    curr_utxo += 1
+                    emit(utxo)
+
+            def classify(utxo, emit):
+                utxo['coinstake'], _, utxo['staker'] = ClassifyOutput(utxo['raw_tx'], utxo['vout'], isTestnet)
+                emit(utxo)
+                emitProgress('classified')
+
+            def persist(utxos, emit):
+                # classified utxos are saved as they come (one transaction per batch):
+                # an interrupted update is resumed by the next one, that skips them
+                self.caller.parent.db.syncRewards(utxos, [], [])
+
+            pipeline = Pipeline("rewards", ctrl)
+            pipeline.addStage("fetch", fetch, workers=API_MAX_WORKERS)
+            pipeline.addStage("dedupe", dedupe)
+            pipeline.addStage("prefetch", prefetch, batch_size=RPC_BATCH_SIZE)
+            pipeline.addStage("classify", classify)
+            pipeline.addStage("persist", persist, batch_size=RPC_BATCH_SIZE)
+            try:
+                if not pipeline.run(masternodes):
+                    printDbg("Rewards update cancelled")
+                    return
+            except Exception as e:
+                printError(f"{getCallerName()}", f"{getFunctionName()}", f"{e}")
+                return
 
+            # Spent UTXOs are known only once every explorer answered
+            removed = [key for key in saved if key not in fetched]
+            printDbg(f"Number of UTXOs: {len(fetched)} - new: {progress['new']} - spent: {len(removed)}")
+            self.caller.parent.db.syncRewards([], updated, removed)
             printDbg("--# REWARDS table updated")
+            printDbg(f"Address caches: {getAddressCacheStats()}")
+            self.rewardsStale = False
             self.caller.sig_UTXOsLoading.emit(100)
 
     def onCancel(self):
@@ -240,7 +306,7 @@ class TabRewards:
         # reload MnSelect
         self.loadMnSelect()
         # reload utxos
-        self.onReloadUTXOs()
+        self.onReloadUTXOs(PRIORITY_BACKGROUND)
 
     def onChangeSelectedMN(self, isInitializing=False):
         self.curr_name = None
@@ -252,10 +318,10 @@ class TabRewards:
             self.curr_hwpath = self.ui.mnSelect.itemData(self.ui.mnSelect.currentIndex())[3]
             self.ui.rewardsList.box.collateralRow = None
             self.onCancel()
-            # If we are initializing the class, don't display_mn_utxos. It's still empty
+            # Rewards are kept in the database across sessions: display the saved ones
             if not isInitializing:
                 self.ui.resetStatusLabel()
-                self.display_mn_utxos()
+            self.display_mn_utxos()
 
     def onSelectAllRewards(self):
         self.ui.rewardsList.box.selectAll()
@@ -265,10 +331,23 @@ class TabRewards:
         self.ui.rewardsList.box.clearSelection()
         self.updateSelection()
 
-    def onReloadUTXOs(self):
-        if not self.Lock.locked():
+    def onReloadUTXOs(self, priority=PRIORITY_GUI):
+        if not self.caller.jobs.isRunning("rewards"):
             self.ui.resetStatusLabel()
-            self.runInThread(self.load_utxos_thread, ())
+            self.caller.jobs.submit("rewards", self.load_utxos_thread, priority=priority)
+
+    def reloadStaleUTXOs(self):
+        # update the rewards saved by a previous session, as soon as the wallet is connected
+        # (failed attempts are retried with an increasing delay)
+        if not self.rewardsStale or not self.caller.rpcConnected or self.caller.jobs.isRunning("rewards"):
+            return
+        if self.lastStaleReload is not None:
+            delay = min(REWARDS_RETRY_DELAY * 2 ** (self.staleReloads - 1), REWARDS_MAX_RETRY_DELAY)
+            if time.monotonic() - self.lastStaleReload < delay:
+                return
+        self.staleReloads += 1
+        self.lastStaleReload = time.monotonic()
+        self.onReloadUTXOs(PRIORITY_BACKGROUND)
 
     def onSendRewards(self):
         self.dest_addr = self.ui.destinationLine.text().strip()
@@ -460,8 +539,9 @@ class TabRewards:
                         mess2 = QMessageBox(QMessageBox.Information, 'transaction Sent', f"{mess2_text}", parent=self.caller)
                         mess2.setDetailedText(txid)
                         mess2.exec_()
-                        # remove spent rewards from DB
+                        # remove spent rewards from DB and the explorer answers from cache
                         self.removeSpentRewards()
+                        self.caller.apiClient.invalidateCache()
                         # reload utxos
                         self.display_mn_utxos()
                         self.onCancel()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+"""
+Throughput of Database.addReward / Database.getReward.
+Compares the pooled WAL connections with the previous behaviour
+(a new sqlite3 connection opened and closed for every call).
+Run from the src directory:  python -m tests.benchDatabase [num_of_rewards]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from database import Database
+
+
+class LegacyDatabase(Database):
+    """
+    Open/commit/close a rollback-journal connection on every cursor (pre-pooling behaviour)
+    """
+    def openDB(self):
+        with self.lock:
+            self.conn = sqlite3.connect(self.file_name)
+            self.initTables()
+            self.conn.commit()
+            self.conn.close()
+            self.isOpen = True
+
+    def close(self):
+        self.isOpen = False
+
+    def connect(self):
+        return self.conn
+
+    def getCursor(self):
+        self.lock.acquire()
+        self.conn = sqlite3.connect(self.file_name)
+        return self.conn.cursor()
+
+    def releaseCursor(self, rollingBack=False, vacuum=False):
+        try:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+        finally:
+            self.lock.release()
+
+
+def make_reward(i):
+    return {'txid': f"{i:064x}", 'vout': i % 4, 'satoshis': 100000000 + i, 'confirmations': i,
+            'script': "", 'mn_name': f"mn{i % 100}", 'coinstake': True, 'staker': ""}
+
+
+def run(db_class, num_of_rewards):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = db_class(None)
+        db.file_name = os.path.join(tmp_dir, 'bench.db')
+        db.openDB()
+        rewards = [make_reward(i) for i in range(num_of_rewards)]
+
+        start = time.perf_counter()
+        for utxo in rewards:
+            db.addReward(utxo)
+        t_add = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for utxo in rewards:
+            db.getReward(utxo['txid'], utxo['vout'])
+        t_get = time.perf_counter() - start
+
+        db.close()
+        return num_of_rewards / t_add, num_of_rewards / t_get
+
+
+def main():
+    num_of_rewards = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{num_of_rewards} rewards")
+    for label, db_class in [("connection per call", LegacyDatabase), ("pooled WAL", Database)]:
+        add_rate, get_rate = run(db_class, num_of_rewards)
+        print(f"{label:>20}: addReward {add_rate:10.0f} ops/s | getReward {get_rate:10.0f} ops/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+"""
+Base58 throughput: int.from_bytes/to_bytes b58encode/b58decode vs the previous
+power-sum implementation, encoding and decoding 100k addresses (25 bytes each),
+plus b58check_decode.
+Run from the src directory:  python -m tests.benchPivx_b58
+"""
+import os
+import time
+
+from pivx_b58 import b58chars, b58encode, b58decode, b58check_encode, b58check_decode
+
+NUM_OF_ADDRESSES = 100000
+
+
+def legacy_b58encode(v):
+    # previous encoder (256 ** i powers, string prepends)
+    long_value = 0
+    for (i, c) in enumerate(v[::-1]):
+        long_value += (256 ** i) * c
+    result = ''
+    while long_value >= 58:
+        div, mod = divmod(long_value, 58)
+        result = b58chars[mod] + result
+        long_value = div
+    result = b58chars[long_value] + result
+    nPad = 0
+    for c in v:
+        if c == 0:
+            nPad += 1
+        else:
+            break
+    return (b58chars[0] * nPad) + result
+
+
+def legacy_b58decode(v):
+    # previous decoder (58 ** i powers, bytes prepends)
+    long_value = 0
+    for (i, c) in enumerate(v[::-1]):
+        long_value += b58chars.find(c) * (58 ** i)
+    result = bytes()
+    while long_value >= 256:
+        div, mod = divmod(long_value, 256)
+        result = bytes([mod]) + result
+        long_value = div
+    result = bytes([long_value]) + result
+    nPad = 0
+    for c in v:
+        if c == b58chars[0]:
+            nPad += 1
+        else:
+            break
+    return bytes(nPad) + result
+
+
+def bench(label, func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>20}: {elapsed:7.3f} sec ({1e6 * elapsed / len(items):6.2f} us each)")
+    return elapsed
+
+
+def main():
+    payloads = [bytes([30]) + os.urandom(20) for _ in range(NUM_OF_ADDRESSES)]
+    addresses = [b58check_encode(p) for p in payloads]
+    raw_addresses = [b58decode(a) for a in addresses]
+    assert all(legacy_b58encode(r) == a for r, a in zip(raw_addresses[:1000], addresses))
+    assert all(legacy_b58decode(a) == r for r, a in zip(raw_addresses[:1000], addresses))
+    print(f"{NUM_OF_ADDRESSES} addresses")
+    t_old = bench("legacy encode", legacy_b58encode, raw_addresses)
+    t_new = bench("b58encode", b58encode, raw_addresses)
+    print(f"{'':>20}  {t_old / t_new:.1f}x")
+    t_old = bench("legacy decode", legacy_b58decode, addresses)
+    t_new = bench("b58decode", b58decode, addresses)
+    print(f"{'':>20}  {t_old / t_new:.1f}x")
+    bench("b58check_decode", b58check_decode, addresses)
+
+
+if __name__ == '__main__':
+    main()
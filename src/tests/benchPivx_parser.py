@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+"""
+ParseTx throughput: memoryview TxParser (from bytes and from hex) vs the previous
+HexParser, over the txes of tests/test_transaction.data.json and synthetic
+multi-thousand-input txes.
+Run from the src directory:  python -m tests.benchPivx_parser
+"""
+import os
+import time
+
+import simplejson as json
+
+from pivx_hashlib import pubkeyhash_to_address
+from pivx_parser import IsCoinBase, ParseTx
+from tests.testPivx_parserMethods import make_tx
+import utils
+
+
+class HexParser():
+    # previous parser (hex string slices)
+    def __init__(self, hex_str):
+        self.cursor = 0
+        self.hex_str = hex_str
+
+    def readInt(self, nbytes, byteorder="big", signed=False):
+        if self.cursor + nbytes * 2 > len(self.hex_str):
+            raise Exception("HexParser range error")
+        b = bytes.fromhex(self.hex_str[self.cursor:self.cursor + nbytes * 2])
+        res = int.from_bytes(b, byteorder=byteorder, signed=signed)
+        self.cursor += nbytes * 2
+        return res
+
+    def readVarInt(self):
+        r = self.readInt(1)
+        if r == 253:
+            return self.readInt(2, "little")
+        elif r == 254:
+            return self.readInt(4, "little")
+        elif r == 255:
+            return self.readInt(8, "little")
+        return r
+
+    def readString(self, nbytes, byteorder="big"):
+        if self.cursor + nbytes * 2 > len(self.hex_str):
+            raise Exception("HexParser range error")
+        res = self.hex_str[self.cursor:self.cursor + nbytes * 2]
+        self.cursor += nbytes * 2
+        if byteorder == "little":
+            splits = [res[i:i + 2] for i in range(0, len(res), 2)]
+            return ''.join(splits[::-1])
+        return res
+
+
+def LegacyParseTx(hex_string, isTestnet=False):
+    p = HexParser(hex_string)
+    tx = {"version": p.readInt(4, "little"), "vin": [], "vout": []}
+    for i in range(p.readVarInt()):
+        vin = {"txid": p.readString(32, "little"), "vout": p.readInt(4, "little")}
+        vin["scriptSig"] = {"hex": p.readString(p.readVarInt(), "big")}
+        vin["sequence"] = p.readInt(4, "little")
+        if IsCoinBase(vin):
+            vin = {"coinbase": vin["scriptSig"]["hex"], "sequence": vin["sequence"]}
+        tx["vin"].append(vin)
+    for i in range(p.readVarInt()):
+        vout = {"value": p.readInt(8, "little")}
+        vout["scriptPubKey"] = {"hex": p.readString(p.readVarInt(), "big"), "addresses": []}
+        locking_script = bytes.fromhex(vout["scriptPubKey"]["hex"])
+        if len(locking_script) in [25, 35, 51]:
+            add_bytes = utils.extract_pkh_from_locking_script(locking_script)
+            vout["scriptPubKey"]["addresses"].append(pubkeyhash_to_address(add_bytes, isTestnet))
+        tx["vout"].append(vout)
+    tx["locktime"] = p.readInt(4, "little")
+    return tx
+
+
+def bench(func, rawtx, min_time=0.5):
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        func(rawtx)
+        n += 1
+    return 1000 * (time.perf_counter() - start) / n
+
+
+def main():
+    with open(os.path.join(os.path.dirname(__file__), 'test_transaction.data.json'), encoding="utf-8") as f:
+        txes = list(json.load(f)['raw_transactions'].values())
+    cases = [(f"data tx {i} ({len(tx) // 2} bytes)", tx) for i, tx in enumerate(txes)]
+    cases += [(f"synthetic {n} inputs", make_tx(n, 2).hex()) for n in (1000, 5000)]
+    for label, rawtx in cases:
+        assert LegacyParseTx(rawtx) == ParseTx(rawtx)
+        t_old = bench(LegacyParseTx, rawtx)
+        t_hex = bench(ParseTx, rawtx)
+        t_bytes = bench(ParseTx, bytes.fromhex(rawtx))
+        print(f"{label:>28}: HexParser {t_old:8.3f} ms | TxParser hex {t_hex:8.3f} ms ({t_old / t_hex:4.1f}x)"
+              f" | bytes {t_bytes:8.3f} ms ({t_old / t_bytes:4.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+"""
+Payment queue ranking of synthetic listmasternodes payloads.
+Compares rankMasternodes with the previous ranking (score.index for each masternode).
+The quadratic version is skipped above 20k masternodes.
+Run from the src directory:  python -m tests.benchRankMasternodes [sizes...]
+"""
+import random
+import sys
+import time
+
+from rpcClient import rankMasternodes
+
+
+def legacyRank(masternodes, current_time):
+    score = []
+    for mn in masternodes:
+        if mn.get('status') == 'ENABLED':
+            if mn.get('lastpaid') == 0:
+                mn['score'] = mn.get('activetime')
+            else:
+                mn['score'] = min(current_time - mn.get('lastpaid'), mn.get('activetime'))
+        else:
+            mn['score'] = 0
+        score.append(mn)
+
+    score.sort(key=lambda x: x['score'], reverse=True)
+    for mn in masternodes:
+        mn['queue_pos'] = score.index(mn)
+
+
+def make_payload(size, current_time):
+    rnd = random.Random(size)
+    return [{'rank': i, 'txhash': f"{i:064x}", 'outidx': 1,
+             'status': 'ENABLED' if rnd.random() < 0.9 else 'EXPIRED',
+             'addr': f"D{i:033d}", 'version': 70920,
+             'lastseen': current_time - rnd.randrange(3600),
+             'activetime': rnd.randrange(10 ** 7),
+             'lastpaid': 0 if rnd.random() < 0.05 else current_time - rnd.randrange(10 ** 6)}
+            for i in range(size)]
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [5000, 10000, 20000, 50000]
+    current_time = int(time.time())
+    for size in sizes:
+        payload = make_payload(size, current_time)
+        start = time.perf_counter()
+        rankMasternodes(payload, current_time)
+        t_new = time.perf_counter() - start
+        line = f"{size:>6} masternodes: rankMasternodes {1000 * t_new:9.2f} ms"
+        if size <= 20000:
+            expected = [mn['queue_pos'] for mn in payload]
+            payload = make_payload(size, current_time)
+            start = time.perf_counter()
+            legacyRank(payload, current_time)
+            t_old = time.perf_counter() - start
+            assert [mn['queue_pos'] for mn in payload] == expected
+            line += f" | score.index {1000 * t_old:10.2f} ms"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
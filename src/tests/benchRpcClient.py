@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+"""
+Per-call latency of RpcClient against a local stand-in JSON-RPC server.
+Compares the keep-alive connections with the previous behaviour
+(connection opened and closed around every call).
+The optional handshake delay (ms) is added by the server to each new connection,
+to emulate the TCP/TLS handshake round-trips with a remote server.
+Run from the src directory:  python -m tests.benchRpcClient [num_of_calls] [handshake_ms]
+"""
+import sys
+import time
+
+from rpcClient import RpcClient
+from tests.testRpcClientMethods import FakeRpcHandler, start_server
+
+
+class SlowHandshakeHandler(FakeRpcHandler):
+    def setup(self):
+        time.sleep(self.server.handshake_delay)
+        super().setup()
+
+
+class LegacyRpcClient(RpcClient):
+    """
+    Connect / close the http connection around every call (pre keep-alive behaviour)
+    """
+    def getBlockCount(self):
+        self.httpConnection.connect()
+        try:
+            return super().getBlockCount()
+        finally:
+            self.httpConnection.close()
+
+
+def run(client_class, port, num_of_calls):
+    client = client_class('http', f"127.0.0.1:{port}", 'user', 'pass')
+    start = time.perf_counter()
+    for _ in range(num_of_calls):
+        client.getBlockCount()
+    return 1000 * (time.perf_counter() - start) / num_of_calls
+
+
+def main():
+    num_of_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    handshake_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    server = start_server(SlowHandshakeHandler)
+    server.handshake_delay = handshake_ms / 1000
+
+    print(f"{num_of_calls} calls - handshake delay {handshake_ms} ms")
+    for label, client_class in [("connection per call", LegacyRpcClient), ("keep-alive", RpcClient)]:
+        server.connections = 0
+        latency = run(client_class, server.server_port, num_of_calls)
+        print(f"{label:>20}: {latency:8.3f} ms/call | {server.connections} connections")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import simplejson as json
+
+from apiClient import ApiBackend, ApiCache, ApiRouter
+from blockbookClient import BlockBookClient
+from cryptoIDClient import CryptoIDClient
+
+# balances (satoshis) of the fake servers
+PRIMARY = 100000000
+BACKUP = 250000000
+
+
+class FakeBlockbookHandler(BaseHTTPRequestHandler):
+    '''
+    Blockbook stand-in: /api/address/<addr> answers with the server balance (satoshis),
+    after server.delay seconds, or 404 while server.down is set.
+    '''
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        status = 404 if self.server.down else 200
+        body = json.dumps({'balance': str(self.server.balance)}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(name, balance):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBlockbookHandler)
+    server.name = name
+    server.balance = balance
+    server.requests = 0
+    server.delay = 0
+    server.down = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestApiRouterMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = [start_server("primary", PRIMARY), start_server("backup", BACKUP)]
+        self.backends = [ApiBackend(s.name, BlockBookClient(url=f"http://127.0.0.1:{s.server_port}"), i)
+                         for i, s in enumerate(self.servers)]
+        self.router = ApiRouter(self.backends, cooldown=0.3)
+
+    def tearDown(self):
+        for s in self.servers:
+            s.shutdown()
+            s.server_close()
+
+    def test_primaryFirst(self):
+        for _ in range(5):
+            self.assertEqual(self.router.call('getBalance', 'addr'), PRIMARY)
+        self.assertEqual(self.servers[1].requests, 0)
+
+    def test_failover_and_recovery(self):
+        self.servers[0].down = True
+        self.assertEqual(self.router.call('getBalance', 'addr'), BACKUP)
+        stats = self.router.getStats()["primary"]
+        self.assertTrue(stats['down'])
+        self.assertEqual(stats['last_error'], "Exception: Invalid response")
+        # primary skipped during the cooldown
+        self.assertEqual(self.router.call('getBalance', 'addr'), BACKUP)
+        self.assertEqual(self.servers[0].requests, 1)
+        # and used again after it
+        self.servers[0].down = False
+        time.sleep(0.4)
+        self.assertEqual(self.router.call('getBalance', 'addr'), PRIMARY)
+        self.assertFalse(self.router.getStats()["primary"]['down'])
+
+    def test_allDown(self):
+        for s in self.servers:
+            s.down = True
+        self.assertIsNone(self.router.call('getBalance', 'addr'))
+
+    def test_hedging(self):
+        # warm up the latency stats, then slow down the primary
+        for _ in range(5):
+            self.router.call('getBalance', 'addr')
+        self.servers[0].delay = 1
+        start = time.monotonic()
+        self.assertEqual(self.router.call('getBalance', 'addr'), BACKUP)
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_latencyRanking(self):
+        self.servers[0].delay = 0.3
+        for b in self.backends:
+            self.router.run(b, 'getBalance', ('addr',))
+        # the faster backup is now preferred
+        self.assertEqual(self.router.ranked()[0].name, "backup")
+
+    def test_shutdown(self):
+        self.router.shutdown()
+        # replaced router (network switch): no new requests
+        self.assertIsNone(self.router.call('getBalance', 'addr'))
+        self.assertEqual(self.servers[0].requests, 0)
+
+
+class TestApiClientsMethods(unittest.TestCase):
+
+    def test_balanceUnits(self):
+        # all the backends answer in satoshis
+        cryptoID = CryptoIDClient()
+        cryptoID.checkResponse = lambda parameters: 2.5
+        self.assertEqual(cryptoID.getBalance('addr'), BACKUP)
+        blockbook = BlockBookClient()
+        blockbook.checkResponse = lambda method, param="": {'balance': str(BACKUP)}
+        self.assertEqual(blockbook.getBalance('addr'), BACKUP)
+
+
+class TestApiCacheMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ApiCache(max_size=3, ttl=0.3)
+
+    def test_hitMiss(self):
+        key = ("mainnet", "getAddressUtxos", "addr")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, [{'txid': 'a'}])
+        res = self.cache.get(key)
+        self.assertEqual(res, [{'txid': 'a'}])
+        # cached answer not affected by the caller
+        res[0]['mn_name'] = "mn1"
+        self.assertEqual(self.cache.get(key), [{'txid': 'a'}])
+        self.assertEqual(self.cache.getStats(), {'hits': 2, 'misses': 1, 'size': 1})
+
+    def test_ttl(self):
+        key = ("mainnet", "getBalance", "addr")
+        self.cache.put(key, "1")
+        time.sleep(0.4)
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.getStats()['size'], 0)
+
+    def test_blockHeight(self):
+        self.cache.setBlockHeight("mainnet", 100)
+        self.cache.put(("mainnet", "getBalance", "a"), "1")
+        self.cache.put(("testnet", "getBalance", "a"), "2")
+        # same block: served from cache
+        self.cache.setBlockHeight("mainnet", 100)
+        self.assertEqual(self.cache.get(("mainnet", "getBalance", "a")), "1")
+        # new block: invalidated on its network only
+        self.cache.setBlockHeight("mainnet", 101)
+        self.assertIsNone(self.cache.get(("mainnet", "getBalance", "a")))
+        self.assertEqual(self.cache.get(("testnet", "getBalance", "a")), "2")
+
+    def test_bounded(self):
+        for i in range(5):
+            self.cache.put(("mainnet", "getBalance", i), i)
+        self.assertEqual(self.cache.getStats()['size'], 3)
+        self.assertIsNone(self.cache.get(("mainnet", "getBalance", 0)))
+        self.assertEqual(self.cache.get(("mainnet", "getBalance", 4)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
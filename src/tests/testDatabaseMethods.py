@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from database import Database, SCHEMA_MIGRATIONS, RAWTX_PLAIN, RAWTX_ZLIB
+from proposals import Proposal
+
+
+class TestDatabaseMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(None)
+        self.db.file_name = os.path.join(self.tmp_dir.name, 'test.db')
+        self.db.openDB()
+
+    def tearDown(self):
+        if self.db.isOpen:
+            self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_journalMode(self):
+        cursor = self.db.getCursor()
+        cursor.execute("PRAGMA journal_mode")
+        mode = cursor.fetchone()[0]
+        self.db.releaseCursor()
+        self.assertEqual(mode, "wal")
+
+    def test_schemaMigrations(self):
+        cursor = self.db.getCursor()
+        self.assertEqual(cursor.execute("PRAGMA user_version").fetchone()[0], len(SCHEMA_MIGRATIONS))
+        for query, index in [("SELECT * FROM REWARDS WHERE mn_name = 'a'", "idx_rewards_mn_name"),
+                             ("SELECT tx_hash FROM RAWTXES ORDER BY lastfetch LIMIT 10", "idx_rawtxes_lastfetch"),
+                             ("SELECT * FROM MY_VOTES WHERE p_hash = 'a'", "idx_myvotes_p_hash")]:
+            plan = cursor.execute("EXPLAIN QUERY PLAN " + query).fetchall()
+            self.assertIn(index, str(plan))
+        # re-opening does not re-apply the migrations
+        self.db.releaseCursor()
+        self.db.close()
+        self.db.openDB()
+        self.assertTrue(self.db.isOpen)
+
+    def test_addGetReward(self):
+        utxo = self.getReward(1)
+        self.db.addReward(utxo)
+        self.assertEqual(self.db.getReward(utxo['txid'], utxo['vout']), utxo)
+        self.assertIsNone(self.db.getReward(utxo['txid'], utxo['vout'] + 1))
+
+    def test_addRewards(self):
+        utxos = [self.getReward(i) for i in range(50)]
+        self.db.addRewards(utxos)
+        self.assertEqual(len(self.db.getRewardsList()), 50)
+        self.assertEqual(self.db.getRewardsList('mn7'), [utxos[7]])
+        # a failing row rolls back the whole batch
+        self.db.addRewards([self.getReward(60), {'txid': "bad"}])
+        self.assertIsNone(self.db.getReward(self.getReward(60)['txid'], 0))
+
+    def test_syncRewards(self):
+        utxos = [self.getReward(i) for i in range(10)]
+        self.db.addRewards(utxos)
+        utxos[3]['confirmations'] += 5
+        new_utxo = self.getReward(20)
+        self.db.syncRewards([new_utxo], [utxos[3]], [(utxos[0]['txid'], utxos[0]['vout'])])
+        rewards = {r['txid']: r for r in self.db.getRewardsList()}
+        self.assertEqual(len(rewards), 10)
+        self.assertNotIn(utxos[0]['txid'], rewards)
+        self.assertEqual(rewards[utxos[3]['txid']]['confirmations'], utxos[3]['confirmations'])
+        self.assertEqual(rewards[new_utxo['txid']], new_utxo)
+
+    def test_addProposals(self):
+        proposals = [Proposal(f"prop{i}", "http://url", f"{i:064x}", "", 100, 200, 2, 1, "D",
+                              i, 0, 0, 10.0, 5.0) for i in range(10)]
+        self.db.addProposals(proposals)
+        self.assertEqual(sorted(p.name for p in self.db.getProposalsList()), sorted(p.name for p in proposals))
+
+    def test_addRawTxes(self):
+        txes = [(f"{i:064x}", f"{i:08x}") for i in range(10)]
+        self.db.addRawTxes(txes, 1000)
+        for tx_hash, rawtx in txes:
+            self.assertEqual(self.db.getRawTx(tx_hash)['rawtx'], bytes.fromhex(rawtx))
+
+    def test_getRawTxes(self):
+        txes = [(f"{i:064x}", f"{i:08x}") for i in range(1200)]
+        self.db.addRawTxes(txes)
+        missing = "ff" * 32
+        res = self.db.getRawTxes([tx_hash for tx_hash, _ in txes] + [missing])
+        self.assertEqual(res, {tx_hash: bytes.fromhex(rawtx) for tx_hash, rawtx in txes})
+        self.assertEqual(self.db.getRawTxes([]), {})
+
+    def test_rawTxBlob(self):
+        rawtx = bytes.fromhex("0100000001" + "00" * 300 + "ffffffff")
+        self.db.addRawTx("a", rawtx)
+        self.db.addRawTx("b", "abcd")
+        cursor = self.db.getCursor()
+        blobs = dict(cursor.execute("SELECT tx_hash, rawtx FROM RAWTXES").fetchall())
+        self.db.releaseCursor()
+        # compressed only when smaller
+        self.assertEqual(blobs["a"][0], RAWTX_ZLIB)
+        self.assertLess(len(blobs["a"]), len(rawtx))
+        self.assertEqual(blobs["b"], bytes([RAWTX_PLAIN]) + bytes.fromhex("abcd"))
+        self.assertEqual(self.db.getRawTxes(["a", "b"]), {"a": rawtx, "b": bytes.fromhex("abcd")})
+
+    def test_rawTxBlobMigration(self):
+        # hex text rows of schema version 1
+        cursor = self.db.getCursor()
+        cursor.executemany("INSERT INTO RAWTXES VALUES (?, ?, ?)", [("a", "00" * 100, 0), ("b", "zz", 0)])
+        cursor.execute("PRAGMA user_version = 1")
+        self.db.releaseCursor()
+        self.db.close()
+        self.db.openDB()
+        cursor = self.db.getCursor()
+        self.assertEqual(cursor.execute("SELECT typeof(rawtx) FROM RAWTXES").fetchall(), [("blob",)])
+        self.db.releaseCursor()
+        self.assertEqual(self.db.getRawTx("a")['rawtx'], bytes(100))
+        # invalid rows dropped
+        self.assertIsNone(self.db.getRawTx("b"))
+
+    def test_touchRawTxes(self):
+        self.db.addRawTxes([("a", "00"), ("b", "00"), ("c", "00")], 1000)
+        # reads don't write
+        self.db.getRawTx("a")
+        self.db.getRawTxes(["b"])
+        cursor = self.db.getCursor()
+        self.assertEqual(cursor.execute("SELECT MAX(lastfetch) FROM RAWTXES").fetchone()[0], 1000)
+        self.db.releaseCursor()
+        # access times saved in batch (not more often than RAWTXES_TOUCH_INTERVAL)
+        self.db.lastActivity = 0
+        self.db.touchRawTxes({"a": 1500, "b": 100000})
+        self.assertEqual(self.db.lastActivity, 0)
+        cursor = self.db.getCursor()
+        lastfetch = dict(cursor.execute("SELECT tx_hash, lastfetch FROM RAWTXES").fetchall())
+        self.db.releaseCursor()
+        self.assertEqual(lastfetch, {"a": 1000, "b": 100000, "c": 1000})
+
+    def test_evictRawTxes(self):
+        # 10 txes of 101 bytes, oldest first
+        for i in range(10):
+            self.db.addRawTx(f"{i}", os.urandom(100), i)
+        reward = self.getReward(1)
+        reward['txid'] = "0"
+        self.db.addReward(reward)
+        # within budget
+        self.assertEqual(self.db.evictRawTxes(max_bytes=2000), 0)
+        # reward tx "0" and pinned "1" kept, then least recently used first, in steps
+        self.assertEqual(self.db.evictRawTxes(max_bytes=505, pinned=["1"], max_rows=2), 2)
+        self.assertEqual(self.db.evictRawTxes(max_bytes=505, pinned=["1"], max_rows=2), 2)
+        self.assertEqual(self.db.evictRawTxes(max_bytes=505, pinned=["1"], max_rows=2), 1)
+        self.assertEqual(self.db.evictRawTxes(max_bytes=505, pinned=["1"], max_rows=2), 0)
+        self.assertEqual(sorted(self.db.getRawTxes([f"{i}" for i in range(10)])), ["0", "1", "7", "8", "9"])
+
+    def test_rawTxesSize(self):
+        # (101 bytes blobs) counted by the first eviction step, then kept up to date by the writers
+        self.db.addRawTxes([("a", os.urandom(100))])
+        self.assertIsNone(self.db.rawTxesSize)
+        self.assertEqual(self.db.evictRawTxes(max_bytes=1000), 0)
+        self.assertEqual(self.db.rawTxesSize, 101)
+        self.db.addRawTxes([("b", os.urandom(100))])
+        self.db.addRawTx("c", os.urandom(100))
+        self.assertEqual(self.db.rawTxesSize, 303)
+        # within budget: the table is not read
+        self.db.rawTxesSize = 0
+        self.assertEqual(self.db.evictRawTxes(max_bytes=152), 0)
+        # above budget: exact count
+        self.db.rawTxesSize = 10 ** 6
+        self.assertEqual(self.db.evictRawTxes(max_bytes=152), 2)
+        self.assertEqual(self.db.rawTxesSize, 101)
+
+    def test_checkpoints(self):
+        self.assertIsNone(self.db.getCheckpoint("job"))
+        self.db.saveCheckpoint("job", {'done': [["hash", "mn1"]]})
+        self.assertEqual(self.db.getCheckpoint("job"), {'done': [["hash", "mn1"]]})
+        self.db.deleteCheckpoint("job")
+        self.assertIsNone(self.db.getCheckpoint("job"))
+        # by prefix
+        self.db.saveCheckpoint("vote_0_a", {'done': []})
+        self.db.saveCheckpoint("vote_2_b", {'done': []})
+        self.db.saveCheckpoint("votes", {})
+        self.assertEqual(sorted(self.db.getCheckpoints("vote_")), ["vote_0_a", "vote_2_b"])
+        # expired
+        cursor = self.db.getCursor()
+        cursor.execute("UPDATE JOBS SET updated = 0 WHERE job_key = 'vote_0_a'")
+        self.db.releaseCursor()
+        self.assertIsNone(self.db.getCheckpoint("vote_0_a"))
+        self.assertEqual(list(self.db.getCheckpoints("vote_")), ["vote_2_b"])
+        self.db.clearCheckpoints(1)
+        self.assertIsNone(self.db.getCheckpoint("vote_0_a", max_age=time.time()))
+        self.assertEqual(self.db.getCheckpoint("vote_2_b"), {'done': []})
+
+    def test_incrementalVacuum(self):
+        cursor = self.db.getCursor()
+        self.assertEqual(cursor.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.db.releaseCursor()
+        self.db.addRawTxes([(f"{i:064x}", "00" * 2000) for i in range(500)])
+        self.db.clearTable('RAWTXES')
+        # not idle and below threshold: nothing to do
+        self.assertEqual(self.db.runMaintenance(idle_time=3600, freelist_threshold=10 ** 6), 0)
+        # freelist above threshold: bounded step
+        self.assertEqual(self.db.runMaintenance(idle_time=3600, max_pages=10, freelist_threshold=0), 10)
+        # idle: reclaim everything left
+        while self.db.runMaintenance(idle_time=0) > 0:
+            pass
+        cursor = self.db.getCursor()
+        self.assertEqual(cursor.execute("PRAGMA freelist_count").fetchone()[0], 0)
+        self.db.releaseCursor()
+
+    def test_evictionThenMaintenance(self):
+        # watchdog tick: the eviction step must not delay the idle vacuum
+        self.db.addRawTxes([(f"{i:064x}", "00" * 2000) for i in range(500)])
+        self.db.lastActivity = 0
+        self.assertGreater(self.db.evictRawTxes(max_bytes=0, max_rows=500), 0)
+        self.assertEqual(self.db.lastActivity, 0)
+        self.assertGreater(self.db.runMaintenance(idle_time=60, freelist_threshold=10 ** 6), 0)
+
+    def test_housekeepingConnectionError(self):
+        # the watchdog steps report the failure instead of raising
+        self.db.addRawTxes([("a", "00")])
+
+        def fail():
+            raise sqlite3.OperationalError("unable to open database file")
+
+        self.db.connect = fail
+        self.assertEqual(self.db.evictRawTxes(max_bytes=0), 0)
+        self.db.touchRawTxes({"a": 100000})
+
+    def test_connectionPerThread(self):
+        conns = []
+
+        def worker():
+            with self.db.lock:
+                conns.append(self.db.connect())
+            self.db.addReward(self.getReward(len(conns)))
+
+        with self.db.lock:
+            main_conn = self.db.connect()
+            self.assertIs(self.db.connect(), main_conn)
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertNotIn(main_conn, conns)
+        self.assertEqual(len(self.db.getRewardsList()), 4)
+
+    def test_reopen(self):
+        utxo = self.getReward(2)
+        self.db.addReward(utxo)
+        self.db.close()
+        self.assertRaises(Exception, self.db.getCursor)
+        self.db.openDB()
+        self.assertEqual(self.db.getReward(utxo['txid'], utxo['vout']), utxo)
+
+    def getReward(self, i):
+        return {'txid': f"{i:064x}", 'vout': i % 2, 'satoshis': 1000 * i, 'confirmations': i,
+                'script': "", 'mn_name': f"mn{i}", 'coinstake': 1, 'staker': ""}
+
+    if __name__ == '__main__':
+        unittest.main(verbosity=2)
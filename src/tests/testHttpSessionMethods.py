@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from httpSession import HttpSession
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    '''
+    /ok answers 200, /flaky answers 503 to the first server.failures requests,
+    /slow waits server.delay seconds before answering.
+    '''
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests += 1
+        status = 200
+        if self.path.startswith('/flaky') and self.server.failures > 0:
+            self.server.failures -= 1
+            status = 503
+        elif self.path.startswith('/slow'):
+            time.sleep(self.server.delay)
+        body = b'{"balance": "1"}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpSessionMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeApiHandler)
+        self.server.requests = 0
+        self.server.connections = 0
+        self.server.failures = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.session = HttpSession(timeout=(1, 0.5), max_retries=2, backoff=0.01, max_rate=1000)
+
+    def tearDown(self):
+        self.session.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keepAlive(self):
+        for i in range(10):
+            self.assertEqual(self.session.get(f"{self.url}/ok/{i}", endpoint='ok').json()['balance'], "1")
+        self.assertEqual(self.server.connections, 1)
+        stats = self.session.getStats()['ok']
+        self.assertEqual(stats['count'], 10)
+        self.assertEqual(stats['success_rate'], 1)
+        self.assertIsNotNone(stats['p95'])
+
+    def test_retry(self):
+        self.server.failures = 2
+        resp = self.session.get(f"{self.url}/flaky")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.server.requests, 3)
+        stats = self.session.getStats()[f"127.0.0.1:{self.server.server_port}/flaky"]
+        self.assertEqual(stats['errors'], 2)
+        self.assertEqual(stats['last_error'], "HTTP 503")
+        # retries exhausted: last response returned
+        self.server.failures = 5
+        self.assertEqual(self.session.get(f"{self.url}/flaky").status_code, 503)
+
+    def test_timeout(self):
+        self.server.delay = 1
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.session.get(f"{self.url}/slow", endpoint='slow')
+        stats = self.session.getStats()['slow']
+        self.assertEqual(stats['errors'], 3)
+        self.assertEqual(stats['success_rate'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import os
+import tempfile
+import threading
+import unittest
+
+from database import Database
+from jobManager import JobManager, JOB_CANCELLED, JOB_DONE, JOB_FAILED
+
+
+class TestJobManagerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(None)
+        self.db.file_name = os.path.join(self.tmp_dir.name, 'test.db')
+        self.db.openDB()
+        self.jobs = JobManager(self.db)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def count_thread(self, ctrl, total):
+        # counts to total, one step at a time, checkpointing each step
+        self.started.set()
+        while ctrl.checkpoint.get('count', 0) < total:
+            if ctrl.finish:
+                return
+            ctrl.checkpoint['count'] = ctrl.checkpoint.get('count', 0) + 1
+            ctrl.saveCheckpoint()
+            ctrl.setProgress(int(100 * ctrl.checkpoint['count'] / total))
+            self.release.wait()
+
+    def run_job(self, key, fun, args=()):
+        return self.jobs.submit(key, fun, args)
+
+    def test_done(self):
+        self.release.set()
+        job = self.run_job("count", self.count_thread, (5,))
+        job.thread.wait()
+        self.assertEqual(job.status, JOB_DONE)
+        self.assertEqual(job.checkpoint, {'count': 5})
+        self.assertEqual(self.jobs.getJobs(), [{'key': "count", 'status': JOB_DONE, 'progress': 100}])
+        # completed: no checkpoint left
+        self.assertIsNone(self.db.getCheckpoint("count"))
+
+    def test_dedupe(self):
+        job = self.run_job("count", self.count_thread, (5,))
+        self.started.wait()
+        self.assertIs(self.run_job("count", self.count_thread, (5,)), job)
+        self.assertTrue(self.jobs.isRunning("count"))
+        self.release.set()
+        job.thread.wait()
+        self.assertFalse(self.jobs.isRunning("count"))
+
+    def test_cancelResume(self):
+        job = self.run_job("count", self.count_thread, (5,))
+        self.started.wait()
+        self.assertTrue(self.jobs.cancel("count"))
+        self.release.set()
+        job.thread.wait()
+        self.assertEqual(job.status, JOB_CANCELLED)
+        self.assertFalse(self.jobs.cancel("count"))
+        interrupted_at = self.db.getCheckpoint("count")['count']
+        self.assertLess(interrupted_at, 5)
+        # the next job continues from the checkpoint
+        counted = []
+        job = self.run_job("count", lambda ctrl: counted.append(ctrl.checkpoint['count']) or self.count_thread(ctrl, 5))
+        job.thread.wait()
+        self.assertEqual(counted, [interrupted_at])
+        self.assertEqual(job.status, JOB_DONE)
+
+    def test_failed(self):
+        def fail_thread(ctrl):
+            ctrl.checkpoint['step'] = 1
+            raise Exception("failure")
+
+        job = self.run_job("fail", fail_thread)
+        job.thread.wait()
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertEqual(self.db.getCheckpoint("fail"), {'step': 1})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
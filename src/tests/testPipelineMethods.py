@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from pipeline import Pipeline
+
+
+class TestPipelineMethods(unittest.TestCase):
+
+    def test_stream(self):
+        out = []
+        batches = []
+
+        def double(item, emit):
+            emit(item * 2)
+
+        def collect(items, emit):
+            batches.append(len(items))
+            out.extend(items)
+
+        pipeline = Pipeline("test", queue_size=5)
+        pipeline.addStage("double", double, workers=3)
+        pipeline.addStage("collect", collect, batch_size=10)
+        self.assertTrue(pipeline.run(range(100)))
+        self.assertEqual(sorted(out), list(range(0, 200, 2)))
+        self.assertTrue(max(batches) <= 10)
+        stats = pipeline.getStats()
+        self.assertEqual(stats['double']['items'], 100)
+        self.assertEqual(stats['collect']['items'], 100)
+
+    def test_backpressure(self):
+        # a slow stage blocks the previous ones: at most queue_size items waiting
+        produced = []
+        consumed = []
+
+        def produce(item, emit):
+            produced.append(item)
+            emit(item)
+
+        def consume(item, emit):
+            time.sleep(0.01)
+            self.assertLessEqual(len(produced) - len(consumed), 2 + 3)
+            consumed.append(item)
+
+        pipeline = Pipeline("test", queue_size=2)
+        pipeline.addStage("produce", produce)
+        pipeline.addStage("consume", consume)
+        self.assertTrue(pipeline.run(range(30)))
+        self.assertEqual(consumed, list(range(30)))
+
+    def test_cancel(self):
+        ctrl = SimpleNamespace(finish=False)
+        consumed = []
+
+        def consume(item, emit):
+            consumed.append(item)
+            if item == 5:
+                ctrl.finish = True
+
+        pipeline = Pipeline("test", ctrl, queue_size=2)
+        pipeline.addStage("consume", consume)
+        start = time.monotonic()
+        self.assertFalse(pipeline.run(range(1000)))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(consumed, list(range(6)))
+
+    def test_error(self):
+        def fail(item, emit):
+            if item == 3:
+                raise ValueError("bad item")
+            emit(item)
+
+        pipeline = Pipeline("test")
+        pipeline.addStage("fail", fail, workers=2)
+        pipeline.addStage("sink", lambda item, emit: None)
+        with self.assertRaises(ValueError):
+            pipeline.run(range(100))
+        self.assertEqual([t for t in threading.enumerate() if t.name.startswith("test-")], [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
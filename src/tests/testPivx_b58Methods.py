@@ -5,7 +5,7 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 import unittest
-from pivx_b58 import b58chars, b58encode, b58decode
+from pivx_b58 import b58chars, b58encode, b58decode, b58check_encode, b58check_decode
 from random import randint
 
 
@@ -31,6 +31,24 @@ class TestPivx_b58Methods(unittest.TestCase):
         # verify
         self.assertEqual(b58encode(decoded_text), text)
 
+    def test_leadingZeros(self):
+        for data in [b'', b'\x00', b'\x00\x00\x01\x02', bytes(range(256))]:
+            self.assertEqual(b58decode(b58encode(data)), data)
+        self.assertEqual(b58encode(b'\x00\x00\x01'), "112")
+        self.assertIsNone(b58decode("112", length=2))
+        # non-base58 chars
+        self.assertIsNone(b58decode("D0OIl"))
+
+    def test_checkEncodeDecode(self):
+        data = bytes([30]) + bytes(20)
+        encoded_text = b58check_encode(data)
+        self.assertEqual(encoded_text, "D596YFweJQuHY1BbjazZYmAbt8jJPbKehC")
+        self.assertEqual(b58check_decode(encoded_text), data)
+        self.assertIsNone(b58check_decode(encoded_text, length=20))
+        # wrong checksum
+        self.assertIsNone(b58check_decode(encoded_text[:-1] + "z"))
+        self.assertIsNone(b58check_decode("1"))
+
     def randomBytesString(self, length):
         randomString = bytes()
         for _ in range(length):
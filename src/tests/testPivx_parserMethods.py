@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import os
+import struct
+import unittest
+
+import simplejson as json
+
+from pivx_parser import ClassifyOutput, GetDelegatedStaker, IsPayToColdStaking, ParseTx, TxParser
+
+P2PKH_SCRIPT = "76a9140cb412217817cb84feebe8ef3c5089182aa593ec88ac"
+P2CS_SCRIPT = "76a97b63d114" + "0cb412217817cb84feebe8ef3c5089182aa593ec" + "6714" + "11" * 20 + "6888ac"
+
+
+def varint(n):
+    if n < 253:
+        return bytes([n])
+    if n < 2 ** 16:
+        return b'\xfd' + struct.pack("<H", n)
+    if n < 2 ** 32:
+        return b'\xfe' + struct.pack("<I", n)
+    return b'\xff' + struct.pack("<Q", n)
+
+
+def make_tx(num_of_inputs, num_of_outputs, scripts=None):
+    # synthetic serialized tx with P2PKH outputs (or with the given output scripts)
+    tx = struct.pack("<I", 1) + varint(num_of_inputs)
+    for i in range(num_of_inputs):
+        script_sig = bytes(106)
+        tx += i.to_bytes(32, "little") + struct.pack("<I", i % 3) + varint(len(script_sig)) + script_sig
+        tx += struct.pack("<I", 0xffffffff)
+    if scripts is None:
+        scripts = [P2PKH_SCRIPT] * num_of_outputs
+    tx += varint(len(scripts))
+    for i, script in enumerate(scripts):
+        script = bytes.fromhex(script)
+        tx += struct.pack("<Q", 100000000 * i) + varint(len(script)) + script
+    return tx + struct.pack("<I", 0)
+
+
+class TestPivx_parserMethods(unittest.TestCase):
+
+    def test_TxParser(self):
+        p = TxParser(bytes([1, 253]) + struct.pack("<H", 300) + struct.pack("<I", 7) + bytes.fromhex("0a0b"))
+        self.assertEqual(p.readVarInt(), 1)
+        self.assertEqual(p.readVarInt(), 300)
+        self.assertEqual(p.readUInt32(), 7)
+        self.assertEqual(p.readHex(2, "little"), "0b0a")
+        self.assertRaises(Exception, p.readUInt32)
+
+    def test_ParseTx(self):
+        tx = ParseTx(make_tx(300, 2))
+        self.assertEqual(tx['version'], 1)
+        self.assertEqual(len(tx['vin']), 300)
+        self.assertEqual(tx['vin'][299]['txid'], f"{299:064x}")
+        self.assertEqual(tx['vin'][299]['vout'], 299 % 3)
+        self.assertEqual(tx['vin'][0]['sequence'], 0xffffffff)
+        self.assertEqual([out['value'] for out in tx['vout']], [0, 100000000])
+        self.assertEqual(tx['vout'][1]['scriptPubKey']['hex'], P2PKH_SCRIPT)
+        self.assertEqual(tx['vout'][1]['scriptPubKey']['addresses'], ["D6JGN6nUgE9UcvFwPv9oUw5stGeNj2NTJc"])
+        self.assertEqual(tx['locktime'], 0)
+
+    def test_ParseTx_data(self):
+        # hex and bytes inputs give the same result
+        with open(os.path.join(os.path.dirname(__file__), 'test_transaction.data.json'), encoding="utf-8") as f:
+            data = json.load(f)
+        for txid, rawtx in data['raw_transactions'].items():
+            tx = ParseTx(rawtx)
+            self.assertEqual(tx, ParseTx(bytes.fromhex(rawtx)))
+            self.assertTrue(len(tx['vin']) > 0 and len(tx['vout']) > 0)
+
+    def test_ParseTx_withoutAddresses(self):
+        tx = ParseTx(make_tx(1, 2), withAddresses=False)
+        self.assertEqual(tx['vout'][1]['scriptPubKey']['hex'], P2PKH_SCRIPT)
+        self.assertEqual(tx['vout'][1]['scriptPubKey']['addresses'], [])
+
+    def test_ClassifyOutput(self):
+        rawtx = make_tx(1, 0, ["", P2CS_SCRIPT, P2PKH_SCRIPT])
+        self.assertEqual(ClassifyOutput(rawtx, 1), (True, True, "SNTArgcz7BSPcDroCm9KV54qev9WD6zMRM"))
+        self.assertEqual(ClassifyOutput(rawtx, 2), (True, False, ""))
+        self.assertEqual(ClassifyOutput(make_tx(1, 1), 0), (False, False, ""))
+        # wrappers
+        self.assertEqual(IsPayToColdStaking(rawtx, 1), (True, True))
+        self.assertEqual(GetDelegatedStaker(rawtx, 1, False), ClassifyOutput(rawtx, 1)[2])
+
+    def test_ParseTx_truncated(self):
+        self.assertRaises(Exception, ParseTx, make_tx(2, 2)[:-10])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
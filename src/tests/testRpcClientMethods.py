@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import simplejson as json
+
+from rpcClient import RpcClient, rankMasternodes
+
+
+class FakeRpcHandler(BaseHTTPRequestHandler):
+    '''
+    Minimal JSON-RPC server: echoes [method, params], fails method 'fail',
+    and answers batch requests in reverse order.
+    With server.drop set, silently closes the connection after each response.
+    Methods in server.abort close the connection without any response.
+    '''
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def answer(self, req):
+        self.server.calls.append(req['method'])
+        if req['method'] == 'fail':
+            return {'result': None, 'error': {'code': -1, 'message': 'failed'}, 'id': req['id']}
+        if req['method'] == 'getblockcount':
+            return {'result': 1000, 'error': None, 'id': req['id']}
+        if req['method'] == 'getinfo':
+            return {'result': {'testnet': True}, 'error': None, 'id': req['id']}
+        if req['method'] == 'mnsync':
+            return {'result': {'IsBlockchainSynced': True}, 'error': None, 'id': req['id']}
+        return {'result': [req['method'], req['params']], 'error': None, 'id': req['id']}
+
+    def do_POST(self):
+        self.server.requests += 1
+        data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if isinstance(data, list):
+            res = [self.answer(req) for req in reversed(data)]
+        else:
+            res = self.answer(data)
+            if data['method'] in self.server.abort:
+                self.close_connection = True
+                return
+        body = json.dumps(res).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = self.server.drop
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handler=FakeRpcHandler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.requests = 0
+    server.connections = 0
+    server.drop = False
+    server.calls = []
+    server.abort = ()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestRpcClientMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_server()
+        self.client = RpcClient('http', f"127.0.0.1:{self.server.server_port}", 'user', 'pass')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch(self):
+        calls = [['getrawtransaction', f"{i:064x}"] for i in range(20)]
+        calls.insert(5, ['fail'])
+        res = self.client.batch(calls)
+        # single request, results in order, None for the failed call
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(len(res), len(calls))
+        self.assertIsNone(res[5])
+        for c, r in zip(calls[:5] + calls[6:], res[:5] + res[6:]):
+            self.assertEqual(r, [c[0], c[1:]])
+        self.assertEqual(self.client.batch([]), [])
+
+    def test_getStatusAndSync(self):
+        status, _, n, r_time, isTestnet, isSynced = self.client.getStatusAndSync()
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(sorted(self.server.calls), ['getblockcount', 'getinfo', 'mnsync'])
+        self.assertTrue(status)
+        self.assertEqual(n, 1000)
+        self.assertIsNotNone(r_time)
+        self.assertTrue(isTestnet)
+        self.assertTrue(isSynced)
+
+    def test_keepAlive(self):
+        for _ in range(10):
+            self.assertEqual(self.client.getBlockCount(), 1000)
+        self.assertEqual(self.server.requests, 10)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_reconnect(self):
+        self.server.drop = True
+        for _ in range(5):
+            self.assertEqual(self.client.getBlockCount(), 1000)
+        self.assertEqual(self.server.connections, 5)
+
+    def test_noRetry(self):
+        # idempotent calls are sent again after a dropped connection
+        self.server.abort = ('getblockcount',)
+        self.assertIsNone(self.client.getBlockCount())
+        self.assertEqual(self.server.calls.count('getblockcount'), 2)
+        # state changing calls are sent once, on a fresh connection
+        self.server.abort = ('sendrawtransaction',)
+        self.assertIsNone(self.client.sendRawTransaction("00"))
+        self.assertEqual(self.server.calls.count('sendrawtransaction'), 1)
+        self.server.abort = ()
+        self.server.drop = True
+        self.assertEqual(self.client.getBlockCount(), 1000)
+        self.assertEqual(self.client.sendRawTransaction("00"), ['sendrawtransaction', ["00", True]])
+        self.assertEqual(self.server.calls.count('sendrawtransaction'), 2)
+
+    def test_connectionPerThread(self):
+        res = []
+        threads = [threading.Thread(target=lambda: res.append(self.client.getBlockCount())) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(res, [1000] * 4)
+        self.assertEqual(self.server.connections, 4)
+
+    def test_serverDown(self):
+        self.tearDown()
+        self.assertIsNone(self.client.batch([['getblockcount']]))
+        self.assertFalse(self.client.getStatusAndSync()[0])
+
+
+class TestRankMasternodes(unittest.TestCase):
+
+    def test_rankMasternodes(self):
+        t = 10000
+        masternodes = [
+            {'txhash': 'a', 'status': 'ENABLED', 'lastpaid': 0, 'activetime': 500},
+            {'txhash': 'b', 'status': 'ENABLED', 'lastpaid': t - 800, 'activetime': 5000},
+            {'txhash': 'c', 'status': 'EXPIRED', 'lastpaid': 0, 'activetime': 9000},
+            {'txhash': 'd', 'status': 'ENABLED', 'lastpaid': t - 3000, 'activetime': 2000},
+            {'txhash': 'e', 'status': 'ENABLED', 'lastpaid': t - 500, 'activetime': 600},
+        ]
+        rankMasternodes(masternodes, t)
+        self.assertEqual([mn['score'] for mn in masternodes], [500, 800, 0, 2000, 500])
+        # decreasing score, ties in list order
+        self.assertEqual([mn['queue_pos'] for mn in masternodes], [2, 1, 4, 0, 3])
+        self.assertEqual(rankMasternodes([]), [])
+
+    def test_rankMasternodes_identical(self):
+        # equal entries get distinct positions
+        masternodes = [{'status': 'ENABLED', 'lastpaid': 0, 'activetime': 100} for _ in range(3)]
+        rankMasternodes(masternodes, 1000)
+        self.assertEqual(sorted(mn['queue_pos'] for mn in masternodes), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import QCoreApplication
+
+from threads import ThreadPool, PRIORITY_GUI, PRIORITY_BACKGROUND
+from workerThread import WorkerThread
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def process_events_until(condition, timeout=5):
+    # deliver the queued completion signals to the main thread
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+class TestThreadsMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ThreadPool({'test': 1, 'wide': 3})
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def submit(self, fun, args=(), on_thread_finish=None, on_thread_exception=None, queue='test',
+               priority=PRIORITY_GUI):
+        worker = WorkerThread(fun, args)
+        self.pool.submit(worker, on_thread_finish, on_thread_exception, queue, priority)
+        return worker
+
+    def test_callbacks(self):
+        finished = []
+        worker = self.submit(lambda ctrl, x: x * 2, (21,),
+                             on_thread_finish=lambda: finished.append(threading.current_thread()))
+        self.assertTrue(process_events_until(lambda: len(finished) > 0))
+        self.assertEqual(worker.worker_result, 42)
+        # delivered in the main thread
+        self.assertIs(finished[0], threading.main_thread())
+
+    def test_exception(self):
+        def fail(ctrl):
+            raise ValueError("bad")
+
+        errors = []
+        worker = self.submit(fail, on_thread_exception=lambda e: errors.append(e))
+        self.assertTrue(process_events_until(lambda: len(errors) > 0))
+        self.assertIsInstance(errors[0], ValueError)
+        self.assertTrue(worker.ctrl_obj.finish)
+
+    def test_priority(self):
+        order = []
+        # keep the single thread busy, then queue background jobs before a GUI one
+        started = threading.Event()
+        self.submit(lambda ctrl: started.set() or self.release.wait())
+        self.assertTrue(started.wait(5))
+        workers = [self.submit(lambda ctrl, i: order.append(i), (i,), priority=PRIORITY_BACKGROUND)
+                   for i in range(3)]
+        workers.append(self.submit(lambda ctrl: order.append("gui")))
+        self.assertEqual(self.pool.getStats()['test'], {'threads': 1, 'pending': 4})
+        self.release.set()
+        for w in workers:
+            self.assertTrue(w.wait(5))
+        self.assertEqual(order, ["gui", 0, 1, 2])
+
+    def test_bounded(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def job(ctrl):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        workers = [self.submit(job, queue='wide') for _ in range(12)]
+        for w in workers:
+            self.assertTrue(w.wait(5))
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(self.pool.getStats()['wide']['threads'], 3)
+
+    def test_call(self):
+        future = self.pool.call(lambda x: x * 2, (21,), queue='wide')
+        self.assertEqual(future.result(5), 42)
+        future = self.pool.call(lambda: 1 / 0, queue='wide')
+        self.assertIsInstance(future.exception(5), ZeroDivisionError)
+        # cancelled before running: skipped
+        started = threading.Event()
+        self.submit(lambda ctrl: started.set() or self.release.wait())
+        self.assertTrue(started.wait(5))
+        ran = []
+        future = self.pool.call(lambda: ran.append(1), queue='test')
+        self.assertTrue(future.cancel())
+        self.release.set()
+        self.assertIsNone(self.pool.call(lambda: None, queue='test').result(5))
+        self.assertEqual(ran, [])
+
+    def test_stop(self):
+        def loop(ctrl):
+            while not ctrl.finish:
+                time.sleep(0.01)
+            return "stopped"
+
+        worker = self.submit(loop)
+        worker.stop()
+        self.assertTrue(worker.wait(5))
+        self.assertEqual(worker.worker_result, "stopped")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017-2019 Random.Zebra (https://github.com/random-zebra/)
+# Distributed under the MIT software license, see the accompanying
+# file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from database import Database
+from txCache import TxCache
+
+
+class FakeRpcClient:
+    def __init__(self):
+        self.requested = []
+        self.threads = set()
+        self.delay = 0
+
+    def getRawTransactions(self, txids):
+        time.sleep(self.delay)
+        self.requested += txids
+        self.threads.add(threading.current_thread().name)
+        return [f"raw{txid}".encode().hex() if not txid.startswith("x") else None for txid in txids]
+
+
+class TestTxCacheMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db = Database(None)
+        db.file_name = os.path.join(self.tmp_dir.name, 'test.db')
+        db.openDB()
+        self.rpc = FakeRpcClient()
+        self.main_wnd = SimpleNamespace(parent=SimpleNamespace(db=db), rpcClient=self.rpc)
+        TxCache.instance = None
+        self.cache = TxCache(self.main_wnd)
+
+    def tearDown(self):
+        TxCache.instance = None
+        self.main_wnd.parent.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_singleton(self):
+        self.assertIs(TxCache(self.main_wnd), self.cache)
+
+    def test_tiers(self):
+        self.main_wnd.parent.db.addRawTx("a", b"rawa")
+        self.assertEqual(self.cache.get_many(["a", "b", "xc"]), {"a": b"rawa", "b": b"rawb"})
+        self.assertEqual(sorted(self.rpc.requested), ["b", "xc"])
+        # fetched tx saved in the database
+        self.assertEqual(self.main_wnd.parent.db.getRawTx("b")['rawtx'], b"rawb")
+        # then served from memory
+        self.main_wnd.parent.db.clearTable('RAWTXES')
+        self.assertEqual(self.cache["a"], b"rawa")
+        self.assertEqual(self.cache["b"], b"rawb")
+        self.assertEqual(len(self.rpc.requested), 2)
+
+    def test_byteBound(self):
+        self.cache.max_bytes = 100
+        self.cache.get_many([f"{i:02d}" for i in range(50)])
+        self.assertLessEqual(self.cache.size, 100)
+        self.assertEqual(self.cache.size, sum(len(v) for v in self.cache.memory.values()))
+        # least recently used entries evicted first
+        self.assertEqual(self.cache["new"], b"rawnew")
+        self.assertEqual(next(reversed(self.cache.memory)), "new")
+        self.assertLessEqual(self.cache.size, 100)
+
+    def test_accessed(self):
+        self.main_wnd.parent.db.addRawTx("a", b"rawa", 1000)
+        self.cache.get_many(["a", "b"])
+        # read from the database: access time collected in memory only
+        self.assertEqual(sorted(self.cache.pop_accessed()), ["a"])
+        self.assertEqual(self.cache.pop_accessed(), {})
+        self.cache.get_many(["a", "b"])
+        self.assertEqual(sorted(self.cache.pop_accessed()), ["a", "b"])
+
+    def test_sharedThreads(self):
+        # batches sent by the threads of the pool (and their rpc connections) reused by every miss
+        for i in range(3):
+            self.cache.get_many([f"{i}{j:03d}" for j in range(250)])
+        self.assertEqual(len(self.rpc.requested), 750)
+        self.assertTrue(self.rpc.threads <= {f"rpc-{n}" for n in range(4)})
+
+    def test_coalescing(self):
+        self.rpc.delay = 0.3
+        res = []
+        threads = [threading.Thread(target=lambda: res.append(self.cache["t"])) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(res, [b"rawt"] * 5)
+        self.assertEqual(self.rpc.requested, ["t"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -5,8 +5,8 @@
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
 import unittest
-from utils import checkPivxAddr, compose_tx_locking_script
-from pivx_hashlib import generate_privkey, pubkey_to_address
+from utils import checkPivxAddr, compose_tx_locking_script, getAddressCacheStats
+from pivx_hashlib import generate_privkey, pubkey_to_address, pubkeyhash_to_address
 from bitcoin import privkey_to_pubkey
 from bitcoin.main import b58check_to_hex
 
@@ -30,6 +30,22 @@ class TestUtilsMethods(unittest.TestCase):
             pivxAddr3 += self.getRandomChar()
         self.assertFalse(checkPivxAddr(pivxAddr3))
 
+    def test_addressCaches(self):
+        pubkeyhash_to_address.cache_clear()
+        checkPivxAddr.cache_clear()
+        pkh = bytes(range(20))
+        pivxAddr = pubkeyhash_to_address(pkh)
+        for _ in range(3):
+            self.assertEqual(pubkeyhash_to_address(pkh), pivxAddr)
+            self.assertTrue(checkPivxAddr(pivxAddr))
+        # network and staking flag are part of the key
+        self.assertNotEqual(pubkeyhash_to_address(pkh, True), pivxAddr)
+        self.assertNotEqual(pubkeyhash_to_address(pkh, False, True), pivxAddr)
+        self.assertFalse(checkPivxAddr(pivxAddr, True))
+        stats = getAddressCacheStats()
+        self.assertEqual(stats['pubkeyhash_to_address'], {'hits': 3, 'misses': 3, 'size': 3, 'hit_rate': 0.5})
+        self.assertEqual(stats['checkPivxAddr'], {'hits': 2, 'misses': 2, 'size': 2, 'hit_rate': 0.5})
+
     def test_compose_tx_locking_script(self):
         # check with P2PKH addresses
         # Generate Valid PIVX address
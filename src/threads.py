@@ -8,52 +8,148 @@
             Based on project:
             https://github.com/Bertrand256/dash-masternode-tool
 """
+from concurrent.futures import Future
+import itertools
+from queue import PriorityQueue
 import threading
-import traceback
-from functools import partial
+
+from PyQt5.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from constants import THREAD_POOL_QUEUES
+from misc import printDbg
 from workerThread import WorkerThread
 
+# queues
+QUEUE_NETWORK = 'network'  # jobs using the RPC server and the explorers
+QUEUE_HWDEVICE = 'hwdevice'  # hardware wallet (one request at a time)
+# requests made on behalf of a job (never wait on their own queue)
+QUEUE_EXPLORER = 'explorer'  # explorer requests of a job (ApiClient calls)
+QUEUE_API = 'api'  # requests to a single explorer backend (ApiRouter)
+QUEUE_RPC = 'rpc'  # batch requests to the RPC server (TxCache)
+
+# priorities (lower first)
+PRIORITY_GUI = 0  # started by the user
+PRIORITY_BACKGROUND = 1  # automatic refreshes
+
+
+class ThreadDispatcher(QObject):
+    # signal: a worker has finished (emitted by the pool threads, received in the main thread)
+    sig_finished = pyqtSignal(object, object, object)
+
+    def __init__(self):
+        QObject.__init__(self)
+        self.sig_finished.connect(self.onFinished)
+
+    def onFinished(self, worker, on_thread_finish, on_thread_exception):
+        if worker.worker_exception is not None and on_thread_exception is not None:
+            on_thread_exception(worker.worker_exception)
+        elif on_thread_finish is not None:
+            on_thread_finish()
+
+
+class PoolCall(object):
+    """
+    Function call queued in a ThreadPool, with its result in a concurrent.futures.Future
+    """
+    def __init__(self, fun, args):
+        self.fun = fun
+        self.args = args
+        self.future = Future()
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            self.future.set_result(self.fun(*self.args))
+        except Exception as e:
+            self.future.set_exception(e)
+
+
+class ThreadPool(object):
+    """
+    Bounded pool of daemon threads, with a priority queue (and a fixed number of threads)
+    for each kind of job. Workers with the same priority are run in FIFO order.
+    The completion callbacks are delivered in the Qt main thread through a signal.
+    """
+    def __init__(self, queues=THREAD_POOL_QUEUES):
+        self.sizes = dict(queues)
+        self.queues = {name: PriorityQueue() for name in queues}
+        self.threads = {name: [] for name in queues}
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+        self.dispatcher = ThreadDispatcher()
+        if QCoreApplication.instance() is not None:
+            self.dispatcher.moveToThread(QCoreApplication.instance().thread())
+
+    def submit(self, worker, on_thread_finish=None, on_thread_exception=None, queue=QUEUE_NETWORK,
+               priority=PRIORITY_GUI):
+        with self.lock:
+            # threads started with the first job of each queue
+            while len(self.threads[queue]) < self.sizes[queue]:
+                t = threading.Thread(target=self.run, args=(queue,), daemon=True,
+                                     name=f"{queue}-{len(self.threads[queue])}")
+                t.start()
+                self.threads[queue].append(t)
+            self.queues[queue].put((priority, next(self.counter), worker, on_thread_finish, on_thread_exception))
+
+    def run(self, queue):
+        while True:
+            _, _, worker, on_thread_finish, on_thread_exception = self.queues[queue].get()
+            worker.run()
+            if on_thread_finish is not None or on_thread_exception is not None:
+                self.dispatcher.sig_finished.emit(worker, on_thread_finish, on_thread_exception)
+
+    def call(self, fun, args=(), queue=QUEUE_NETWORK, priority=PRIORITY_GUI):
+        """
+        queues fun(*args) and returns its Future (cancelled calls are skipped)
+        """
+        call = PoolCall(fun, args)
+        self.submit(call, queue=queue, priority=priority)
+        return call.future
+
+    def getStats(self):
+        """
+        returns a dict queue --> {threads, pending}
+        """
+        with self.lock:
+            return {name: {'threads': len(self.threads[name]), 'pending': q.qsize()}
+                    for name, q in self.queues.items()}
+
 
 class ThreadFuns:
+    pool = None
+
     @staticmethod
-    def runInThread(worker_fun, worker_fun_args, on_thread_finish=None, on_thread_exception=None,
-                    skip_raise_exception=False):
+    def getPool():
+        if ThreadFuns.pool is None:
+            ThreadFuns.pool = ThreadPool()
+            printDbg(f"Thread pool started: {THREAD_POOL_QUEUES}")
+        return ThreadFuns.pool
+
+    @staticmethod
+    def runInThread(worker_fun, worker_fun_args, on_thread_finish=None, on_thread_exception=None, ctrl_obj=None,
+                    queue=QUEUE_NETWORK, priority=PRIORITY_GUI):
         """
-        Run a function inside a thread.
+        Run a function inside a thread of the shared pool.
         :param worker_fun: reference to function to be executed inside a thread
         :param worker_fun_args: arguments passed to a thread function
-        :param on_thread_finish: function to be called after thread finishes its execution
-        :param skip_raise_exception: Exception raised inside the 'worker_fun' will be passed to the calling thread if:
-            - on_thread_exception is a valid function (it's exception handler)
-            - skip_raise_exception is False
-        :return: reference to a thread object
-        """
-
-        def on_thread_finished_int(thread_arg, on_thread_finish_arg, skip_raise_exception_arg, on_thread_exception_arg):
-            if thread_arg.worker_exception:
-                if on_thread_exception_arg:
-                    on_thread_exception_arg(thread_arg.worker_exception)
-                else:
-                    if not skip_raise_exception_arg:
-                        raise thread_arg.worker_exception
-            else:
-                if on_thread_finish_arg:
-                    on_thread_finish_arg()
-
-        if threading.current_thread() != threading.main_thread():
-            # starting thread from another thread causes an issue of not passing arguments'
-            # values to on_thread_finished_int function, so on_thread_finish is not called
-            st = traceback.format_stack()
-            print(r'Running thread from inside another thread. Stack: \n' + '\n'.join(st))
-
-        thread = WorkerThread(worker_fun=worker_fun, worker_fun_args=worker_fun_args)
-
-        # in Python 3.5 local variables sometimes are removed before calling on_thread_finished_int
-        # so we have to bind that variables with the function ref
-        bound_on_thread_finished = partial(on_thread_finished_int, thread, on_thread_finish, skip_raise_exception,
-                                           on_thread_exception)
-
-        thread.finished.connect(bound_on_thread_finished)
-        thread.daemon = True
-        thread.start()
-        return thread
+        :param on_thread_finish: function to be called (in the main thread) after thread finishes its execution
+        :param on_thread_exception: function to be called (in the main thread) instead of on_thread_finish,
+            with the exception raised inside the 'worker_fun' (otherwise the exception is only logged)
+        :param ctrl_obj: control object passed to worker_fun (default: a new CtrlObject)
+        :param queue: QUEUE_NETWORK or QUEUE_HWDEVICE
+        :param priority: PRIORITY_GUI or PRIORITY_BACKGROUND
+        :return: reference to a worker object (stop / wait)
+        """
+        worker = WorkerThread(worker_fun=worker_fun, worker_fun_args=worker_fun_args, ctrl_obj=ctrl_obj)
+        ThreadFuns.getPool().submit(worker, on_thread_finish, on_thread_exception, queue, priority)
+        return worker
+
+    @staticmethod
+    def callInThread(fun, args=(), queue=QUEUE_NETWORK, priority=PRIORITY_GUI):
+        """
+        Run fun(*args) inside a thread of the shared pool, without control object and callbacks
+        (requests made by a running job).
+        :return: concurrent.futures.Future with the result
+        """
+        return ThreadFuns.getPool().call(fun, args, queue, priority)
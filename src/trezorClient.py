@@ -20,7 +20,7 @@ from constants import MPATH_TREZOR as MPATH, MPATH_TESTNET, HW_devices
 from misc import getCallerName, getFunctionName, printException, printDbg, \
     DisconnectedException, printOK, splitString
 from pivx_parser import ParseTx
-from threads import ThreadFuns
+from threads import ThreadFuns, QUEUE_HWDEVICE
 from txCache import TxCache
 
 from qt.dlg_pinMatrix import PinMatrix_dlg
@@ -147,12 +147,13 @@ class TrezorApi(QObject):
         curr_utxo_checked = 0
         txes = {}
         num_of_txes = sum([len(mnode['utxos']) for mnode in rewardsArray])
+        rawtxes = TxCache(self.main_wnd).get_many(utxo['txid'] for mnode in rewardsArray for utxo in mnode['utxos'])
         for mn in rewardsArray:
             for utxo in mn['utxos']:
                 prev_hash = bytes.fromhex(utxo["txid"])
                 if prev_hash not in txes:
-                    raw_tx = TxCache(self.main_wnd)[utxo['txid']]
-                    json_tx = ParseTx(raw_tx)
+                    raw_tx = rawtxes.get(utxo['txid'])
+                    json_tx = ParseTx(raw_tx, withAddresses=False)
                     txes[prev_hash] = self.json_to_tx(json_tx)
 
                 # completion percent emitted
@@ -234,7 +235,8 @@ class TrezorApi(QObject):
             self.mBox2.setMaximumWidth(500)
             self.mBox2.show()
 
-        ThreadFuns.runInThread(self.signTxSign, (inputs, outputs, txes, isTestnet), self.signTxFinish)
+        ThreadFuns.runInThread(self.signTxSign, (inputs, outputs, txes, isTestnet), self.signTxFinish,
+                               queue=QUEUE_HWDEVICE)
 
     @process_trezor_exceptions
     def scanForAddress(self, account, spath, isTestnet=False):
@@ -283,7 +285,8 @@ class TrezorApi(QObject):
         self.mBox.show()
 
         # Sign message
-        ThreadFuns.runInThread(self.signMessageSign, (path, message, isTestnet), self.signMessageFinish)
+        ThreadFuns.runInThread(self.signMessageSign, (path, message, isTestnet), self.signMessageFinish,
+                               queue=QUEUE_HWDEVICE)
 
     @process_trezor_exceptions
     def signMessageSign(self, ctrl, path, mess, isTestnet):
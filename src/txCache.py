@@ -4,35 +4,155 @@
 # Distributed under the MIT software license, see the accompanying
 # file LICENSE.txt or http://www.opensource.org/licenses/mit-license.php.
 
+from collections import OrderedDict
+from concurrent.futures import Future
+import threading
 from time import time
 
+from constants import RPC_BATCH_SIZE, TXCACHE_MAX_BYTES
+from threads import ThreadFuns, QUEUE_RPC
+
 '''
-Connects with database and rpc clients to keep a cache for rawtxes
+Connects with database and rpc clients to keep a cache for rawtxes.
+Process-wide singleton: in-memory LRU tier (bounded by bytes) over the database tier.
 '''
 
 
 class TxCache():
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __new__(cls, main_wnd):
+        with cls.instance_lock:
+            if cls.instance is None:
+                cls.instance = super().__new__(cls)
+                cls.instance.lock = threading.Lock()
+                cls.instance.memory = OrderedDict()  # txid --> rawtx
+                cls.instance.size = 0
+                cls.instance.max_bytes = TXCACHE_MAX_BYTES
+                cls.instance.inflight = {}  # txid --> Future of the pending rpc request
+                cls.instance.accessed = {}  # txid --> last access time (saved by the DbWatchdog)
+        return cls.instance
 
     def __init__(self, main_wnd):
         self.main_wnd = main_wnd
 
     '''
-    tries to fetch rawtx from database.
+    tries to fetch rawtx from memory, then from database.
     if not found, tries with rpc (and if successful, updates the database)
     '''
     def __getitem__(self, item):
-        rawtx = self.main_wnd.parent.db.getRawTx(item)
-        if rawtx is None:
-            # double check that the rpc connection is still active, else reconnect
-            if self.main_wnd.rpcClient is None:
-                self.main_wnd.updateRPCstatus(None)
+        return self.get_many([item]).get(item)
+
+    def memory_get(self, txid):
+        # must hold self.lock
+        rawtx = self.memory.get(txid)
+        if rawtx is not None:
+            self.memory.move_to_end(txid)
+            self.accessed[txid] = time()
+        return rawtx
+
+    def memory_put(self, txid, rawtx):
+        # must hold self.lock
+        if txid in self.memory:
+            self.size -= len(self.memory.pop(txid))
+        self.memory[txid] = rawtx
+        self.size += len(rawtx)
+        while self.size > self.max_bytes and len(self.memory) > 0:
+            self.size -= len(self.memory.popitem(last=False)[1])
+
+    '''
+    bulk version of __getitem__ for a collection of txids.
+    memory hits first, then the cached txes are read with a single query.
+    the missing ones are fetched with batch requests sent concurrently, and saved with
+    a single transaction. txids already requested by another thread are not requested again.
+    returns a dict txid --> rawtx bytes (without the txes that could not be fetched)
+    '''
+    def get_many(self, txids):
+        txids = set(txids)
+        rawtxes = {}
+        with self.lock:
+            for txid in txids:
+                rawtx = self.memory_get(txid)
+                if rawtx is not None:
+                    rawtxes[txid] = rawtx
+        missing = [txid for txid in txids if txid not in rawtxes]
+        if len(missing) == 0:
+            return rawtxes
+
+        # database tier
+        stored = self.main_wnd.parent.db.getRawTxes(missing)
+        with self.lock:
+            for txid, rawtx in stored.items():
+                self.memory_put(txid, rawtx)
+                self.accessed[txid] = time()
+        rawtxes.update(stored)
+        missing = [txid for txid in missing if txid not in stored]
+        if len(missing) == 0:
+            return rawtxes
 
-            rawtx = self.main_wnd.rpcClient.getRawTransaction(item)
+        # rpc tier: own the txids not requested yet, wait for the others
+        owned = {}
+        waiting = {}
+        with self.lock:
+            for txid in missing:
+                if txid in self.inflight:
+                    waiting[txid] = self.inflight[txid]
+                else:
+                    owned[txid] = self.inflight[txid] = Future()
 
-            # update DB
+        fetched = []
+        try:
+            fetched = self.fetch(list(owned))
+        finally:
+            with self.lock:
+                for txid, rawtx in fetched:
+                    self.memory_put(txid, rawtx)
+                for txid in owned:
+                    self.inflight.pop(txid)
+            res = dict(fetched)
+            for txid, future in owned.items():
+                future.set_result(res.get(txid))
+
+        # update DB
+        if len(fetched) > 0:
+            self.main_wnd.parent.db.addRawTxes(fetched, time())
+        rawtxes.update(fetched)
+
+        for txid, future in waiting.items():
+            rawtx = future.result()
             if rawtx is not None:
-                self.main_wnd.parent.db.addRawTx(item, rawtx, time())
-        else:
-            rawtx = rawtx['rawtx']
+                rawtxes[txid] = rawtx
 
-        return rawtx
+        return rawtxes
+
+    def pop_accessed(self):
+        # returns and clears the access times collected since the last call
+        with self.lock:
+            accessed, self.accessed = self.accessed, {}
+        return accessed
+
+    def fetch(self, txids):
+        # returns the list of (txid, rawtx bytes) received from rpc
+        if len(txids) == 0:
+            return []
+
+        # double check that the rpc connection is still active, else reconnect
+        if self.main_wnd.rpcClient is None:
+            self.main_wnd.updateRPCstatus(None)
+        rpcClient = self.main_wnd.rpcClient
+        if rpcClient is None:
+            return []
+
+        def fetch_batch(batch):
+            return rpcClient.getRawTransactions(batch) or [None] * len(batch)
+
+        # sent concurrently by the QUEUE_RPC threads (long-lived: their keep-alive connections are reused)
+        batches = [txids[i:i + RPC_BATCH_SIZE] for i in range(0, len(txids), RPC_BATCH_SIZE)]
+        futures = [ThreadFuns.callInThread(fetch_batch, (batch,), QUEUE_RPC) for batch in batches]
+        fetched = []
+        for batch, future in zip(batches, futures):
+            res = future.result()
+            fetched += [(txid, bytes.fromhex(rawtx)) for txid, rawtx in zip(batch, res) if rawtx is not None]
+
+        return fetched
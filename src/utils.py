@@ -8,12 +8,14 @@
 
 import base64
 from bitcoin import bin_hash160, b58check_to_hex, ecdsa_raw_sign, ecdsa_raw_verify, privkey_to_pubkey, \
-    encode_sig, decode_sig, dbl_sha256, bin_dbl_sha256, ecdsa_raw_recover, encode_pubkey
+    encode_sig, decode_sig, dbl_sha256, ecdsa_raw_recover, encode_pubkey
+from functools import lru_cache
 from ipaddress import ip_address
 
+from constants import ADDRESS_CACHE_SIZE
 from misc import getCallerName, getFunctionName, printException
-from pivx_b58 import b58decode
-from pivx_hashlib import wif_to_privkey, pubkey_to_address
+from pivx_b58 import b58check_decode
+from pivx_hashlib import wif_to_privkey, pubkey_to_address, pubkeyhash_to_address
 
 # Bitcoin opcodes used in the application
 OP_DUP = b'\x76'
@@ -35,7 +37,9 @@ def b64encode(text):
     return base64.b64encode(bytearray.fromhex(text)).decode('utf-8')
 
 
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
 def checkPivxAddr(address, isTestnet=False):
+    # memoized: the same addresses are checked at each send and message signature/verification
     try:
         # check leading char 'D' or (for testnet) 'x' or 'y'
         if isTestnet and address[0] not in P2PKH_PREFIXES_TNET + P2SH_PREFIXES_TNET:
@@ -44,16 +48,25 @@ def checkPivxAddr(address, isTestnet=False):
             return False
 
         # decode and verify checksum
-        addr_bin = bytes.fromhex(b58decode(address).hex())
-        addr_bin_check = bin_dbl_sha256(addr_bin[0:-4])[0:4]
-        if addr_bin[-4:] != addr_bin_check:
-            return False
-
-        return True
+        return b58check_decode(address) is not None
     except Exception:
         return False
 
 
+def getAddressCacheStats():
+    """
+    returns a dict function --> {hits, misses, size, hit_rate} of the memoized
+    address derivation (pubkeyhash_to_address) and validation (checkPivxAddr)
+    """
+    stats = {}
+    for f in (pubkeyhash_to_address, checkPivxAddr):
+        info = f.cache_info()
+        calls = info.hits + info.misses
+        stats[f.__name__] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize,
+                             'hit_rate': info.hits / calls if calls > 0 else None}
+    return stats
+
+
 def compose_tx_locking_script(dest_address, isTestnet):
     """
     Create a Locking script (ScriptPubKey) that will be assigned to a transaction output.
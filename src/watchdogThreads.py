@@ -11,6 +11,7 @@ from threading import Event
 
 from PyQt5.Qt import QObject
 
+from constants import DB_MAINTENANCE_INTERVAL
 from misc import printOK
 
 
@@ -42,3 +43,28 @@ class RpcWatchdog(QObject):
                 sleep(self.timer_on)
 
         printOK("Exiting Rpc Watchdog Thread")
+
+
+class DbWatchdog(QObject):
+    def __init__(self, db, pinned_txes=None, accessed_txes=None, timer=DB_MAINTENANCE_INTERVAL, *args, **kwargs):
+        QObject.__init__(self, *args, **kwargs)
+        self.shutdown_flag = Event()
+        self.db = db
+        self.pinned_txes = pinned_txes  # function returning the raw txes never evicted
+        self.accessed_txes = accessed_txes  # function returning the raw txes read since the last call
+        self.timer = timer  # delay between maintenance checks
+
+    def run(self):
+        while not self.shutdown_flag.wait(self.timer):
+            # save the access times collected by the readers (before choosing what to evict)
+            if self.accessed_txes is not None:
+                self.db.touchRawTxes(self.accessed_txes())
+            # keep the raw txes cache within its budget, in small steps
+            pinned = self.pinned_txes() if self.pinned_txes is not None else []
+            while self.db.evictRawTxes(pinned=pinned) > 0 and not self.shutdown_flag.is_set():
+                pass
+            # reclaim free pages in small steps (only when idle or when the freelist is too big)
+            while self.db.runMaintenance() > 0 and not self.shutdown_flag.is_set():
+                pass
+
+        printOK("Exiting Db Watchdog Thread")
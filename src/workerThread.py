@@ -9,29 +9,42 @@
             Based on project:
             https://github.com/Bertrand256/dash-masternode-tool
 """
-from PyQt5.QtCore import QThread
+import threading
 
 from misc import printError
 
 
 class CtrlObject(object):
-    pass
+    """
+    Passed to the thread function: finish is set when the thread should stop,
+    progress (0-100) and checkpoint (json-serializable dict) are written by the function.
+    """
+    def __init__(self):
+        self.finish = False
+        self.progress = 0
+        self.checkpoint = {}
+
+    def setProgress(self, percent):
+        self.progress = percent
 
+    def saveCheckpoint(self):
+        pass
 
-class WorkerThread(QThread):
+
+class WorkerThread(object):
     """
-    Helper class for running function inside a thread.
+    Function call queued in a ThreadPool (see threads.py).
+    Keeps the interface of the former QThread based worker (stop / wait / isFinished).
     """
 
-    def __init__(self, worker_fun, worker_fun_args):
-        QThread.__init__(self)
+    def __init__(self, worker_fun, worker_fun_args, ctrl_obj=None):
         self.worker_fun = worker_fun
         self.worker_fun_args = worker_fun_args
         # prepare control object passed to external thread function
-        self.ctrl_obj = CtrlObject()
-        self.ctrl_obj.finish = False
+        self.ctrl_obj = ctrl_obj if ctrl_obj is not None else CtrlObject()
         self.worker_result = None
         self.worker_exception = None
+        self.done = threading.Event()
 
     def stop(self):
         """
@@ -40,9 +53,18 @@ class WorkerThread(QThread):
         """
         self.ctrl_obj.finish = True
 
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def isFinished(self):
+        return self.done.is_set()
+
     def run(self):
         try:
             self.worker_result = self.worker_fun(self.ctrl_obj, *self.worker_fun_args)
         except Exception as e:
             printError("worker thread", "run", f"{e}")
+            self.worker_exception = e
             self.stop()
+        finally:
+            self.done.set()